@@ -0,0 +1,131 @@
+"""Benchmarks importing and loading the pokedex, scoring type matchups, the dominance filter
+   and the team search, writes the timings as json so they can be compared between commits"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# set iteration order changes with the hash seed, fixing it makes every run do the same work
+HASH_SEED = "0"
+
+
+def time_component(component):
+    """times one component in this process, returns seconds"""
+    start = timeit.default_timer()
+    # pylint: disable=import-outside-toplevel
+    import pokedex
+    if component == "import":
+        return timeit.default_timer() - start
+    if component == "load_csv":
+        # what the first run with new data or settings does
+        start = timeit.default_timer()
+        pokedex.read_full_dex()
+        return timeit.default_timer() - start
+    # the full dex saved in the cache folder by the first run, or by load_csv
+    pokedex.load_full_dex()
+    if component == "load":
+        return timeit.default_timer() - start
+    if component == "score_dex_hypothetical":
+        dex = pokedex.hypothetical_dex(pokedex.config_data["stat_exclude"])
+    else:
+        dex = copy.deepcopy(pokedex.full_dex)
+    start = timeit.default_timer()
+    dex, dual_types, _ = pokedex.score_dex(dex, {})
+    if component != "dominance":
+        return timeit.default_timer() - start
+    start = timeit.default_timer()
+    pokedex.remove_dominated(dex, dual_types)
+    return timeit.default_timer() - start
+
+
+def time_search(rank):
+    """times the team search of the national dex cut to the best rank types in this process,
+       after the dex is loaded and shortlisted, returns seconds"""
+    # pylint: disable=import-outside-toplevel
+    import engine
+    untimed_search = engine.search_incumbents
+    seconds = []
+
+    def timed_search(*args):
+        start = timeit.default_timer()
+        result = yield from untimed_search(*args)
+        seconds.append(timeit.default_timer() - start)
+        return result
+
+    engine.search_incumbents = timed_search
+    # the engine reports its progress as it goes, which is not wanted here
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.Engine(use_cache=False).find_teams(engine.Query(rank_types_exclude=rank))
+    return seconds[0]
+
+
+def run(command):
+    """runs a command in the repository with the fixed hash seed, returns its stdout"""
+    env = dict(os.environ, PYTHONHASHSEED=HASH_SEED)
+    return subprocess.run(command, cwd=BENCH_DIR, env=env, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def bench_component(component):
+    """times a component in a fresh process, so nothing is loaded or cached beforehand"""
+    return float(run([sys.executable, __file__, "--component", component]))
+
+
+def bench_search(rank):
+    """times the team search in a fresh process, without the counting of --profile"""
+    return float(run([sys.executable, __file__, "--search_rank", str(rank)]))
+
+
+def main():
+    """runs every benchmark repeat times and writes the results"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", default=5, type=int,
+                        help="times each benchmark is run, the fastest and median are reported")
+    parser.add_argument("--search_ranks", default=[20, 30, 40], type=int, nargs="*",
+                        help="rank_types_exclude values to time the team search with")
+    parser.add_argument("--output", help="json file to write, otherwise it is printed")
+    parser.add_argument("--component", help=argparse.SUPPRESS)
+    parser.add_argument("--search_rank", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.component:
+        print(time_component(args.component))
+        return
+    if args.search_rank is not None:
+        print(time_search(args.search_rank))
+        return
+
+    benchmarks = {component: (bench_component, component) for component in
+                  ["import", "load_csv", "load", "score_dex_national",
+                   "score_dex_hypothetical", "dominance"]}
+    for rank in args.search_ranks:
+        benchmarks[f"search_{rank}"] = (bench_search, rank)
+
+    try:
+        commit = run(["git", "rev-parse", "HEAD"]).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    results = {}
+    for name, (bench, arg) in benchmarks.items():
+        runs = [bench(arg) for _ in range(args.repeat)]
+        results[name] = {"min": min(runs), "median": statistics.median(runs), "runs": runs}
+        print(f"{name}: {results[name]['min']:.4f}s fastest, " +
+              f"{results[name]['median']:.4f}s median", file=sys.stderr)
+    report = {"commit": commit, "python": platform.python_version(), "hash_seed": HASH_SEED,
+              "repeat": args.repeat, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
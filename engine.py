@@ -0,0 +1,541 @@
+"""Finds pokemon teams based on maximizing advantageous type matchup possibilities,
+   keeping the pokedex and type matchups of regions loaded between queries"""
+import os
+import hashlib
+import json
+import pickle
+from dataclasses import dataclass, field
+import pokedex  # dex_store and name_index are built on first use, so they are looked up there
+from pokedex import (config_data, region_files, score_dex, hypothetical_dex, remove_dominated,
+                     form_bits, remove_stale_caches, NameIndex, data_path, TYPE_BITS)
+from search import (Members, Score, SearchStats, TopTeams, score_teams, search_incumbents,
+                    local_search, run_to_end)
+
+# every input_dex that can be asked for
+region_choices = list(region_files()) + ["national", "hypothetical"]
+
+
+@dataclass
+class Query:
+    """Class representing what teams to find, None settings use the settings file"""
+    # pylint: disable=too-many-instance-attributes
+    input_dex: list = field(default_factory=lambda: ["national"])
+    stat_exclude: int = None
+    rank_types_exclude: int = None
+    include_names: list = None  # names of pokemon to put in every team
+    exclude_names: list = None  # names of pokemon to leave out of teams
+    exclude_nums: list = None  # national dex numbers of pokemon to leave out of teams
+    mode: str = "exhaustive"  # exhaustive or local
+    workers: int = None
+    time_budget: float = None
+    seed: int = None
+    keep_top: int = None
+    checkpoint: str = None
+    resume: str = None
+    stats: SearchStats | None = None  # counts what an exhaustive search does
+    what_if: str = None  # state file of the last run, to start from and replace
+
+    def __post_init__(self):
+        for setting, config_setting in [("stat_exclude", "stat_exclude"),
+                                        ("rank_types_exclude", "rank_types_exclude"),
+                                        ("include_names", "include_in_team_names"),
+                                        ("exclude_names", "exclude_from_team_names"),
+                                        ("exclude_nums", "exclude_from_team_nums"),
+                                        ("workers", "workers"),
+                                        ("time_budget", "time_budget"),
+                                        ("keep_top", "keep_top")]:
+            if getattr(self, setting) is None:
+                setattr(self, setting, config_data[config_setting])
+        for region in self.input_dex:
+            if region not in region_choices:
+                raise ValueError(f"{region} is invalid, input region from {region_choices}")
+
+    def dex_key(self):
+        """what the dex and its type matchups depend on, besides the data files and settings"""
+        if self.input_dex == ['hypothetical']:
+            # hypothetical pokemon are given stat_exclude base stats
+            return ("hypothetical", self.stat_exclude)
+        return tuple(sorted(self.input_dex))
+
+
+@dataclass
+class Teams:
+    """Class representing the teams found for a query, teams are tuples of indexes into members"""
+    members: list  # the candidates pokemon, then the start team
+    team_members: Members
+    dual_types: dict
+    poke_choices: dict  # typekey to names of pokemon of that type
+    good_teams: TopTeams
+    top_score: Score
+    stopped: str = None  # why the search stopped early, None if it wasn't stopped
+
+    def score(self, team):
+        """scores a team, an iterable of pokemon in members"""
+        member_index = {poke: index for index, poke in enumerate(self.members)}
+        return score_teams([tuple(member_index[poke] for poke in team)], self.team_members)[0]
+
+    def best_teams(self):
+        """(Score, set of pokemon) of the teams near to the high score, from worst to best"""
+        return [(team_score, {self.members[member] for member in team})
+                for team_score, team in self.good_teams.sorted_items()
+                if team_score.ssestabs_c > self.top_score.ssestabs_c - 1]
+
+
+class Engine:
+    """Class that builds the dex and type matchups of a region once, then finds teams in it"""
+
+    def __init__(self, use_cache=True):
+        self.use_cache = use_cache  # load and save dexes in the cache folder
+        self.dexes = {}  # Query.dex_key() to (dex, dual_types)
+
+    @staticmethod
+    def select_dex(query):
+        """the pokemon of the query's regions, before their type matchups are scored"""
+        dex = set()  # shortlist of pokemon to put in teams and analyze
+
+        exclude_regional_names = ['Alola', 'Galar', 'Husui', 'Paldea', 'Blaze Breed',
+                                  'Combat Breed', 'Aqua Breed']
+        include_regional_names = []
+
+        if query.input_dex == ['national']:
+            print('Calculating best teams for full national dex')
+            if config_data["exclude_mega_evolutions"]:
+                exclude_name_parts = ["Mega ", "Ultra "]
+                print("excluding mega evolutions from analysis")
+            else:
+                exclude_name_parts = []
+            store = pokedex.dex_store
+            dex = {store.pokes[index] for index in
+                   set(range(len(store.pokes))) - store.tagged(form_bits(exclude_name_parts))}
+        elif query.input_dex == ['hypothetical']:
+            print('Calculating best teams assuming all types are possible, ' +
+                  'and existing type and ability combinations are possible')
+            dex = hypothetical_dex(query.stat_exclude)
+        else:
+            print(f'Calculating best teams for {query.input_dex}')
+            if config_data["exclude_mega_evolutions"]:
+                exclude_name_parts = ["Mega ", "Ultra "]
+                print("excluding mega evolutions from analysis")
+            else:
+                exclude_name_parts = []
+            for selected_region in query.input_dex:
+                if 'alola' in selected_region:
+                    if 'alola' in exclude_regional_names:
+                        exclude_regional_names.remove('Alola')
+                    if 'alola' not in include_regional_names:
+                        include_regional_names.append('Alola')
+                if 'galar' in selected_region:
+                    if 'Galar' in exclude_regional_names:
+                        exclude_regional_names.remove('Galar')
+                    if 'Galar' not in include_regional_names:
+                        include_regional_names.append('Galar')
+                if 'husui' in selected_region:
+                    if 'Husui' in exclude_regional_names:
+                        exclude_regional_names.remove('Husui')
+                    if 'Husui' not in include_regional_names:
+                        include_regional_names.append('Husui')
+                if 'paldea' in selected_region:
+                    if 'Paldea' in exclude_regional_names:
+                        exclude_regional_names.remove('Paldea')
+                    if 'Blaze Breed' in exclude_regional_names:
+                        exclude_regional_names.remove('Blaze Breed')
+                    if 'Combat Breed' in exclude_regional_names:
+                        exclude_regional_names.remove('Combat Breed')
+                    if 'Aqua Breed' in exclude_regional_names:
+                        exclude_regional_names.remove('Aqua Breed')
+                    if 'Paldea' not in include_regional_names:
+                        include_regional_names.append('Paldea')
+                    if 'Blaze Breed' not in include_regional_names:
+                        include_regional_names.append('Blaze Breed')
+                    if 'Combat Breed' not in include_regional_names:
+                        include_regional_names.append('Combat Breed')
+                    if 'Aqua Breed' not in include_regional_names:
+                        include_regional_names.append('Aqua Breed')
+            exclude_name_parts = exclude_name_parts + exclude_regional_names
+            # indexes of the pokemon in the regions, and of those in them with regional forms
+            store = pokedex.dex_store
+            in_regions = store.region(query.input_dex)
+            include_bits = form_bits(include_regional_names)
+            regional_nums = {store.pokes[index].number
+                             for index in in_regions & store.tagged(include_bits)}
+            for index in in_regions - store.tagged(form_bits(exclude_name_parts)):
+                poke = store.pokes[index]
+                # a regional form replaces the other forms of its number
+                if poke.number not in regional_nums or store.tags[index] & include_bits:
+                    dex.add(poke)
+            print("excluding regional forms not in region from analysis")
+        return dex
+
+    def build_dex(self, query):
+        """builds the dex of the query's regions and scores its type matchups,
+           returns the dex and dual_types"""
+        dex = self.select_dex(query)
+
+        # dictionary of type combinations to their Type class variable,
+        # key is the typekey int of its types and ability effects, see make_typekey
+        dual_types = {}
+
+        dex, dual_types, _ = score_dex(dex, dual_types)
+
+        # when using hypothetical dex, pokemmon abilities are assessed,
+        # but then removed from typekeys if they do provide a benefit
+        # this ends up making duplicate typekeys, that we should remove.
+        if query.input_dex == ['hypothetical']:
+            for poke in dex.copy():
+                if "ability:" in poke.name and not poke.typekey & ~TYPE_BITS:
+                    dex.remove(poke)
+
+        return dex, dual_types
+
+    def build_dexes(self, queries):
+        """builds the dexes of many queries at once, scoring the type matchups of every pokemon
+           in any of them together. Each query's dual_types are views of the dual types in its
+           own dex, so they score the same as if its dex was built alone.
+           hypothetical pokemon share numbers with real ones, so they are left to load_dex"""
+        dexes = {}  # Query.dex_key() to dex, of the dexes not loaded yet
+        for query in queries:
+            if query.input_dex != ['hypothetical'] and query.dex_key() not in self.dexes:
+                dexes.setdefault(query.dex_key(), self.select_dex(query))
+        if not dexes:
+            return
+        union_dex = set().union(*dexes.values())
+        union_dex, union_dual_types, _ = score_dex(union_dex, {})
+        print(f"scored type matchups of {len(union_dual_types)} type combinations " +
+              f"for {len(dexes)} dexes")
+        for dex_key, dex in dexes.items():
+            # copies of pokemon for an ability that turned out to have no effect were removed,
+            # and pokemon whose only ability had no effect were replaced, so they are matched
+            # by name
+            union_by_name = {poke.name: poke for poke in union_dex}
+            dex = {union_by_name[poke.name] for poke in dex if poke.name in union_by_name}
+            columns = 0
+            for poke in dex:
+                columns |= union_dual_types[poke.typekey].bit
+            self.dexes[dex_key] = (dex, {typekey: mtype.view(columns)
+                                         for typekey, mtype in union_dual_types.items()
+                                         if mtype.bit & columns})
+
+    @staticmethod
+    def dex_digest(query):
+        """hash of everything the build_dex() results depend on: the data files, the code
+           building them, the selected regions and the settings used"""
+        key = hashlib.sha256()
+        key_paths = [os.path.join(data_path, "pokedex.csv"),
+                     os.path.join(data_path, "abilities.csv"), __file__,
+                     os.path.join(os.path.dirname(__file__), "pokedex.py")]
+        key_paths += region_files().values()
+        for key_path in key_paths:
+            with open(key_path, "rb") as key_file:
+                key.update(key_file.read())
+        key.update(repr(query.dex_key()).encode())
+        key.update(repr([config_data[setting] for setting in
+                         ["assess_abilities", "assess_hidden_abilities",
+                          "exclude_mega_evolutions"]]).encode())
+        return key.hexdigest()
+
+    @staticmethod
+    def dex_cache_prefix(query):
+        """start of the names of the query's cached build_dex() results, the same for every
+           version of the data files, code and settings"""
+        return "dex_" + "_".join(map(str, query.dex_key())) + "_"
+
+    def dex_cache_path(self, query):
+        """path of the cached build_dex() results, named by the query's regions and their
+           dex_digest()"""
+        return os.path.join(os.path.dirname(__file__), "cache",
+                            self.dex_cache_prefix(query) + self.dex_digest(query) + ".pickle")
+
+    def load_dex(self, query):
+        """the dex and dual_types of the query's regions, built once and then kept in memory
+           and in the cache folder. The dex is a copy, for the query to remove pokemon from"""
+        dex_key = query.dex_key()
+        if dex_key not in self.dexes:
+            cache_path = self.dex_cache_path(query)
+            if self.use_cache and os.path.isfile(cache_path):
+                with open(cache_path, "rb") as f:
+                    self.dexes[dex_key] = pickle.load(f)
+                print(f"Loaded pokedex and type matchups for {query.input_dex} from cache")
+            else:
+                self.dexes[dex_key] = self.build_dex(query)
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(cache_path + ".tmp", "wb") as f:
+                    pickle.dump(self.dexes[dex_key], f, pickle.HIGHEST_PROTOCOL)
+                os.replace(cache_path + ".tmp", cache_path)
+                remove_stale_caches(cache_path, self.dex_cache_prefix(query))
+                # caches saved before they were named by their regions
+                remove_stale_caches(cache_path, "")
+        dex, dual_types = self.dexes[dex_key]
+        return dex.copy(), dual_types
+
+    def shortlist(self, query):
+        """the dex of the query, without pokemon that are excluded, too weak, have a same typed
+           counterpart with better stats, or have 4x weaknesses.
+           returns the dex, dual_types, and poke_choices of typekey to the names of pokemon
+           of that type"""
+        dex, dual_types = self.load_dex(query)
+
+        print(f"there are {len(dex)} pokemon initially being evaluated for inclusion in team")
+
+        count_abilities = 0
+        for dtype in dual_types:
+            if dtype & ~TYPE_BITS:
+                count_abilities += 1
+        print(f"\t{str(count_abilities)} of those have abilities that affect type matchups, "
+              + "\n\t\tpokemon with multiple possible abilities are duplicated"
+              + "\n\t\tone copy with the ability and one without")
+
+        exclude_nums = set()
+        for num in query.exclude_nums:
+            exclude_nums.add(int(num))
+        # hypothetical pokemon are named by their types, they aren't in the full dex's index
+        name_index = (NameIndex(dex) if query.input_dex == ['hypothetical']
+                      else pokedex.name_index)
+        # matched by name, the dex has copies of some full dex pokemon, see score_dex
+        excluded_names = set()
+        for exclude_name in set(query.exclude_names):
+            excluded_names.update(poke.name for poke in name_index.matching(exclude_name))
+        excluded = {poke for poke in dex
+                    if poke.number in exclude_nums or poke.name in excluded_names}
+        dex -= excluded
+        num_removed = len(excluded)
+        print(f"\t{num_removed} type combinations/pokemon removed for being in " +
+              "exclude_from_team_names or exclude_from_team_nums")
+
+        num_removed = 0
+        if query.stat_exclude != 0:
+            # hypothetical pokemon have stat_exclude base stats, only full dex ones can be weaker.
+            # matched by name, the dex has copies of some full dex pokemon, see score_dex
+            weak_names = pokedex.dex_store.below_stat(query.stat_exclude)
+            weak_poke = {poke for poke in dex if poke.name in weak_names}
+            dex -= weak_poke
+            num_removed = len(weak_poke)
+            print(f"\t{num_removed} type combinations/pokemon removed for having total" +
+                  " base stat values less than " + str(query.stat_exclude))
+
+        # removes pokemon from dex with lower base stats than a same typed counterpart
+        best_poke = set()
+        covered_types = set()
+        poke_choices = {}  # dictionary of typekey to arrays of pokemon names that have that type
+        # in name order, so ties in base stats keep the same pokemon every run
+        for poke in sorted(dex, key=lambda x: x.name):
+            if poke.typekey not in covered_types:
+                covered_types.add(poke.typekey)
+                best_poke.add(poke)
+                poke_choices[poke.typekey] = [poke.name]
+            else:
+                for bpoke in best_poke.copy():
+                    if bpoke.typekey == poke.typekey:
+                        if bpoke.tbstat < poke.tbstat:
+                            best_poke.remove(bpoke)
+                            best_poke.add(poke)
+                        poke_choices[poke.typekey].append(poke.name)
+        num_removed = len(dex) - len(best_poke)
+        dex = best_poke
+        print(f"\t{num_removed} type combinations/pokemon removed for having lower" +
+              " base stat values less than a same typed counterpart")
+
+        # remove pokemon with super (x4) weaknesses
+        # Currently, weakness and strength magnitude is not tracked
+        # EX: it would be a neutral matchup if there is a 4x weakness one side,
+        # and a 2x on the other
+        # there is also the problem of not handling non-stab moves that may have 4X coverage
+        # by default remove from team as you really can't be certain
+        # what something with 4x weakness covers
+        if config_data["exclude_4x_weak_from_team"]:
+            num_removed = 0
+            for poke in dex.copy():
+                # multipliers already include ability resistances and immunities
+                if max(dual_types[poke.typekey].defense) >= 4:
+                    dex.remove(poke)
+                    num_removed += 1
+
+        print(f"\t{num_removed} type combinations/pokemon removed for having 4x weaknesses")
+        print("\t\tthis is controlled by exclude_4x_weak_from_team setting/parameter")
+        return dex, dual_types, poke_choices
+
+    def find_teams(self, query):
+        """finds the best teams for a query, returns them as Teams"""
+        return run_to_end(self.iter_teams(query))
+
+    def iter_teams(self, query):
+        """finds the best teams for a query, yielding (Score, set of pokemon) each time the
+           exhaustive search finds a better team, returns them as Teams"""
+        dex, dual_types, poke_choices = self.shortlist(query)
+
+        num_removed = remove_dominated(dex, dual_types)
+        print(f"\t{num_removed} type combinations/pokemon removed for having" +
+              " alternatives that cover everything they do and more")
+
+        if (query.rank_types_exclude != 0) and (len(dex) > query.rank_types_exclude):
+            typescores = []
+            for poke in dex:
+                typescores.append(dual_types[poke.typekey].score)
+            typescores.sort(reverse=True)
+            num_removed = 0
+            for poke in dex.copy():
+                if dual_types[poke.typekey].score < typescores[query.rank_types_exclude]:
+                    dex.remove(poke)
+                    num_removed += 1
+            print(f"\t{num_removed} type combinations/pokemon removed for having" +
+                  " too many more bad matchups than good ones")
+            print("\t\tthis is controlled by rank_types_exclude setting/parameter")
+
+        print(f"there are {str(len(dex))} type combinations/pokemon left out of " +
+              f"{str(len(dual_types))}")
+
+        start_team = self.start_team(query, dex, dual_types, self.load_dex(query)[0])
+
+        # the search picks from candidates by index, teams are tuples of indexes into members,
+        # the candidates followed by the start team, in name order so searches can be resumed
+        candidates = sorted(dex, key=lambda x: x.name)
+        members = candidates + sorted(start_team, key=lambda x: x.name)
+        team_members = Members(
+            ssestabs=[dual_types[poke.typekey].ssestabs_mask for poke in members],
+            favorables=[dual_types[poke.typekey].ssestabs_mask |
+                        dual_types[poke.typekey].restabs_mask for poke in members],
+            goods=[dual_types[poke.typekey].ssestabs_mask | dual_types[poke.typekey].restabs_mask |
+                   dual_types[poke.typekey].neutrals_mask for poke in members],
+            tscores=[dual_types[poke.typekey].score for poke in members],
+            numbers=[poke.number for poke in members],
+            num_candidates=len(candidates))
+
+        last_run = self.read_what_if(query, members, len(candidates))
+        complete = False  # every team was tried, and every team near the top score was kept
+        stopped = None  # why the exhaustive search stopped early
+        if len(start_team) == 6:
+            good_teams = TopTeams(query.keep_top)
+            start_picks = tuple(range(len(candidates), len(members)))
+            top_score = score_teams([start_picks], team_members)[0]
+            good_teams.add(top_score, start_picks)
+        elif query.mode == "local":
+            good_teams, top_score = local_search(team_members, 6 - len(start_team),
+                                                 query.time_budget, query.seed, query.keep_top)
+        elif last_run["complete"] and not query.resume:
+            # no candidate type was added since a complete search, so its best teams that are
+            # still possible are still the best teams
+            good_teams = TopTeams(query.keep_top)
+            good_teams.update(dict(zip(score_teams(last_run["teams"], team_members),
+                                       last_run["teams"])))
+            top_score = max(good_teams.teams)
+            complete = True
+            print(f"no type was added since the last run in {query.what_if}, " +
+                  f"{len(last_run['teams'])} of its best teams are still possible")
+        else:
+            if query.workers > 1:
+                print(f"searching with {query.workers} worker processes")
+            incumbents = search_incumbents(team_members, 6 - len(start_team), query.workers,
+                                           query.keep_top, query.checkpoint, query.resume,
+                                           query.stats, query.time_budget, last_run["teams"])
+            while True:
+                try:
+                    team_score, team = next(incumbents)
+                except StopIteration as stop:
+                    good_teams, top_score, stopped = stop.value
+                    break
+                yield team_score, {members[member] for member in team}
+            complete = not stopped and not 0 < query.keep_top <= len(good_teams)
+        teams = Teams(members, team_members, dual_types, poke_choices, good_teams, top_score,
+                      stopped)
+        self.write_what_if(query, teams, complete)
+        return teams
+
+    def read_what_if(self, query, members, num_candidates):
+        """the best teams of the last run in the query's what_if file that are still possible
+           with members, as "teams" of member indexes. a pokemon that is no longer a candidate
+           is swapped for the candidate of the same type, they score the same. "complete" is
+           whether they are all of the best teams, when that run was complete and no type was
+           added to the candidates since"""
+        last_run = {"teams": [], "complete": False}
+        if not query.what_if or not os.path.isfile(query.what_if):
+            return last_run
+        with open(query.what_if, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state["dex"] != self.dex_digest(query):
+            print(f"the pokedex or settings changed since the last run in {query.what_if}, " +
+                  "starting from nothing")
+            return last_run
+        # candidates are one pokemon per type, so a type picks the same member as its name did
+        candidate_index = {poke.typekey: index
+                           for index, poke in enumerate(members[:num_candidates])}
+        start_team = [poke.name for poke in members[num_candidates:]]
+        start_picks = tuple(range(num_candidates, len(members)))
+        for team in state["teams"]:
+            picks = [candidate_index.get(state["candidates"].get(name), -1)
+                     for name in team if name not in start_team]
+            if len(picks) + len(start_team) == len(team) and 0 <= min(picks, default=0):
+                last_run["teams"].append(start_picks + tuple(sorted(picks)))
+        last_run["complete"] = (state["complete"] and state["start_team"] == start_team and
+                                len(last_run["teams"]) > 0 and
+                                set(candidate_index) <= set(state["candidates"].values()))
+        return last_run
+
+    def write_what_if(self, query, teams, complete):
+        """saves the best teams of a run to the query's what_if file, for the next run"""
+        if not query.what_if:
+            return
+        num_candidates = teams.team_members.num_candidates
+        state = {"dex": self.dex_digest(query),
+                 "candidates": {poke.name: poke.typekey
+                                for poke in teams.members[:num_candidates]},
+                 "start_team": [poke.name for poke in teams.members[num_candidates:]],
+                 "complete": complete,
+                 "teams": [sorted(poke.name for poke in team)
+                           for _, team in teams.best_teams()]}
+        with open(query.what_if + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=1)
+        os.replace(query.what_if + ".tmp", query.what_if)
+
+    @staticmethod
+    def start_team(query, dex, dual_types, loaded_dex):
+        """finds the query's include_names pokemon, removing them or a same typed stand in
+           from the dex, returns them as a set. loaded_dex is the query's dex before it was
+           shortlisted, names are looked up in the full dex and then taken from it"""
+        include_names = set()
+        for name in query.include_names:
+            include_names.add(name)
+        included_pokemon = set()
+        for include_name in include_names:
+            matches_found = pokedex.name_index.matching(include_name)
+            if len(matches_found) == 0:
+                print(f"WARNING: no matching pokemon for {include_name} from " +
+                      "include_in_team_names setting in settings file, " +
+                      "no pokemon added to team for it")
+            elif len(matches_found) == 1:
+                included_pokemon.update(matches_found)
+            elif pokedex.name_index.find(include_name):
+                included_pokemon.add(pokedex.name_index.find(include_name))
+            else:
+                print(f"WARNING: multiple matching pokemon for {include_name} from " +
+                      "include_in_team_names setting in settings file")
+                match = matches_found[0]
+                included_pokemon.add(match)
+                print(F"\tOnly including first one found: {match.name}")
+
+        # score_dex replaces pokemon whose ability had no effect with a copy without it
+        loaded_by_name = {poke.name: poke for poke in loaded_dex}
+        included_pokemon = {loaded_by_name.get(poke.name, poke) for poke in included_pokemon}
+
+        start_team = set()
+        for poke in included_pokemon:
+            found = False
+            for dpoke in dex.copy():
+                if poke.name == dpoke.name:
+                    dex.remove(dpoke)
+                    start_team.add(dpoke)
+                    found = True
+                    break
+                if poke.typekey == dpoke.typekey:
+                    print(f"including {dpoke.name} in team as a proxy for {poke.name}, " +
+                          "it is the same type with better stats")
+                    dex.remove(dpoke)
+                    start_team.add(dpoke)
+                    found = True
+                    break
+            if not found:
+                if poke.typekey not in dual_types:
+                    print(f"WARNING: {poke.name} was found but not included in team, because " +
+                          "it's type was not evaluated, it may have been excluded for being a " +
+                          "mega evolution or for being from a wrong region?")
+                else:
+                    start_team.add(poke)
+        return start_team
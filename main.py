@@ -1,268 +1,86 @@
 """Calculates pokemon teams based on maximizing advantageous type matchup possibilities"""
-import os
-import copy
-from itertools import combinations
-from math import comb
 import argparse
+import contextlib
+import io
+import json
 import timeit
-import tomllib
-from dataclasses import dataclass
-from pokedex import Pokemon, full_dex, region_nums, types, alltypes, score_dex
-
-
-start = timeit.default_timer()
-
-region_choices = []
-for region in region_nums:
-    region_choices.append(region)
-region_choices.append("national")
-region_choices.append("hypothetical")
-
-default_settings_path = os.path.join(os.path.dirname(__file__), "default_settings.toml")
-with open(default_settings_path, "rb") as f:
-    config_data = tomllib.load(f)
-settings_path = os.path.join(os.path.dirname(__file__), "settings.toml")
-if os.path.isfile(settings_path):
-    with open(settings_path, "rb") as f:
-        custom_config_data = tomllib.load(f)
-    config_data.update(custom_config_data)
-
-parser = argparse.ArgumentParser()
-parser.add_argument("input_dex", default=["national"], nargs='*',
-                    help="the pokedex(es) to create teams from")
-parser.add_argument("--stat_exclude", default=config_data["stat_exclude"],
-                    const=0, nargs='?', type=int,
-                    help="exclude pokemon with total base stat value below this number")
-parser.add_argument("--rank_types_exclude", default=config_data["rank_types_exclude"],
-                    const=0, nargs='?', type=int,
-                    help="only evaluate the best this many types")
-parser.add_argument("--rank_types", action='store_true', help="just rank types/pokemon")
-
-selected_regions = []
-args = parser.parse_args()
-if not isinstance(args.input_dex, list):
-    args.input_dex = [args.input_dex]
-for region_input in args.input_dex:
-    while region_input not in region_choices:
-        region_input = input(f"{region_input} is invalid, input region from {region_choices}: ")
-        if region_input not in region_choices:
-            print("incorrect input")
-    selected_regions.append(region_input)
-
-dex = set()  # shortlist of pokemon to put in teams and analyze
-
-exclude_regional_names = ['Alola', 'Galar', 'Husui', 'Paldea', 'Blaze Breed',
-                          'Combat Breed', 'Aqua Breed']
-include_regional_names = []
-
-if args.input_dex == ['national']:
-    print('Calculating best teams for full national dex')
-    if config_data["exclude_mega_evolutions"]:
-        exclude_name_parts = ["Mega ", "Ultra "]
-        print("excluding mega evolutions from analysis")
-    else:
-        exclude_name_parts = []
-    for poke in full_dex:
-        dex.add(poke)
-        for exclude_name_part in exclude_name_parts:
-            if exclude_name_part.lower() in poke.name.lower():
-                dex.remove(poke)
-elif args.input_dex == ['hypothetical']:
-    print('Calculating best teams assuming all types are possible, ' +
-          'and existing type and ability combinations are possible')
-    temp_types = alltypes.copy()
-    DUMMY_NUM = 1
-    while len(temp_types) > 0:
-        atype = temp_types.pop()
-        for btype in temp_types:
-            dex.add(Pokemon(name=atype+" "+btype, number=DUMMY_NUM, type1=atype, type2=btype,
-                            tbstat=args.stat_exclude, ability1="", ability2="", abilityh=""))
-            DUMMY_NUM += 1
-    ability_poke_typekeys = set()
-    for poke in full_dex:
-        if len(poke.typekey) > 2 and poke.typekey not in ability_poke_typekeys:
-            ability_poke = copy.deepcopy(poke)
-            ability_poke.name = f'{poke.type1} {poke.type2} ability:'
-            for atype in poke.typekey:
-                if len(atype.split("_")) > 1:
-                    ability_poke.name = ability_poke.name + " " + atype
-            ability_poke.tbstat = args.stat_exclude
-            ability_poke_typekeys.add(poke.typekey)
-            dex.add(ability_poke)
-else:
-    print(f'Calculating best teams for {args.input_dex}')
-    if config_data["exclude_mega_evolutions"]:
-        exclude_name_parts = ["Mega ", "Ultra "]
-        print("excluding mega evolutions from analysis")
-    else:
-        exclude_name_parts = []
-    for selected_region in selected_regions:
-        if 'alola' in selected_region:
-            if 'alola' in exclude_regional_names:
-                exclude_regional_names.remove('Alola')
-            if 'alola' not in include_regional_names:
-                include_regional_names.append('Alola')
-        if 'galar' in selected_region:
-            if 'Galar' in exclude_regional_names:
-                exclude_regional_names.remove('Galar')
-            if 'Galar' not in include_regional_names:
-                include_regional_names.append('Galar')
-        if 'husui' in selected_region:
-            if 'Husui' in exclude_regional_names:
-                exclude_regional_names.remove('Husui')
-            if 'Husui' not in include_regional_names:
-                include_regional_names.append('Husui')
-        if 'paldea' in selected_region:
-            if 'Paldea' in exclude_regional_names:
-                exclude_regional_names.remove('Paldea')
-            if 'Blaze Breed' in exclude_regional_names:
-                exclude_regional_names.remove('Blaze Breed')
-            if 'Combat Breed' in exclude_regional_names:
-                exclude_regional_names.remove('Combat Breed')
-            if 'Aqua Breed' in exclude_regional_names:
-                exclude_regional_names.remove('Aqua Breed')
-            if 'Paldea' not in include_regional_names:
-                include_regional_names.append('Paldea')
-            if 'Blaze Breed' not in include_regional_names:
-                include_regional_names.append('Blaze Breed')
-            if 'Combat Breed' not in include_regional_names:
-                include_regional_names.append('Combat Breed')
-            if 'Aqua Breed' not in include_regional_names:
-                include_regional_names.append('Aqua Breed')
-    exclude_name_parts = exclude_name_parts + exclude_regional_names
-    regional_nums = set()
-    for poke in full_dex:
-        for selected_region in selected_regions:
-            if poke.number in region_nums[selected_region]:
-                dex.add(poke)
-                for exclude_name_part in exclude_name_parts:
-                    if exclude_name_part.lower() in poke.name.lower():
-                        dex.remove(poke)
-                for include_name_part in include_regional_names:
-                    if include_name_part.lower() in poke.name.lower():
-                        regional_nums.add(poke.number)
-    for poke in dex.copy():
-        if poke.number in regional_nums:
-            dex.remove(poke)
-        for include_name_part in include_regional_names:
-            if include_name_part.lower() in poke.name.lower():
-                dex.add(poke)
-    print("excluding regional forms not in region from analysis")
-
-# dictionary of type combinations to their Type class variable,
-# key is frozen set of types as strings (ex. "FIRE")
-# and ability effects as strings (ex. "FIRE_Resist")
-dual_types = {}
-
-dex, dual_types = score_dex(dex, dual_types)
-
-# when using hypothetical dex, pokemmon abilities are assessed,
-# but then removed from typekeys if they do provide a benefit
-# this ends up making duplicate typekeys, that we should remove.
-if args.input_dex == ['hypothetical']:
-    for poke in dex.copy():
-        if "ability:" in poke.name and len(poke.typekey) < 3:
-            dex.remove(poke)
-
-print(f"there are {len(dex)} pokemon initially being evaluated for inclusion in team")
-
-COUNT_ABILTIES = 0
-for dtype in dual_types:
-    if len(dtype) > 2:
-        COUNT_ABILTIES += 1
-print(f"\t{str(COUNT_ABILTIES)} of those have abilities that affect type matchups, "
-      + "\n\t\tpokemon with multiple possible abilities are duplicated"
-      + "\n\t\tone copy with the ability and one without")
-
-NUM_REMOVED = 0
-exclude_nums = set()
-for num in config_data["exclude_from_team_nums"]:
-    exclude_nums.add(int(num))
-exclude_names = set()
-for name in config_data["exclude_from_team_names"]:
-    exclude_names.add(name)
-for poke in dex.copy():
-    if poke.number in exclude_nums:
-        dex.remove(poke.name)
-        NUM_REMOVED += 1
-    else:
-        for exlude_name in exclude_names:
-            if exlude_name.lower() in poke.name.lower():
-                dex.remove(poke.name)
-                NUM_REMOVED += 1
-print(f"\t{NUM_REMOVED} type combinations/pokemon removed for being in " +
-      "exclude_from_team_names or exclude_from_team_nums")
-
-NUM_REMOVED = 0
-if args.stat_exclude != 0:
-    weak_poke = set()
-    for poke in dex:
-        if poke.tbstat < args.stat_exclude:
-            weak_poke.add(poke)
-    for poke in weak_poke:
-        dex.remove(poke)
-        NUM_REMOVED += 1
-    print(f"\t{NUM_REMOVED} type combinations/pokemon removed for having total" +
-          " base stat values less than " + str(args.stat_exclude))
-
-# removes pokemon from dex with lower base stats than a same typed counterpart
-best_poke = set()
-covered_types = set()
-poke_choices = {}  # dictionary of typekey to arrays of pokemon names that have that type
-for poke in dex:
-    if poke.typekey not in covered_types:
-        covered_types.add(poke.typekey)
-        best_poke.add(poke)
-        poke_choices[poke.typekey] = [poke.name]
-    else:
-        for bpoke in best_poke.copy():
-            if bpoke.typekey == poke.typekey:
-                if bpoke.tbstat < poke.tbstat:
-                    best_poke.remove(bpoke)
-                    best_poke.add(poke)
-                poke_choices[poke.typekey].append(poke.name)
-NUM_REMOVED = len(dex) - len(best_poke)
-dex = best_poke
-print(f"\t{NUM_REMOVED} type combinations/pokemon removed for having lower" +
-      " base stat values less than a same typed counterpart")
-
-# remove pokemon with super (x4) weaknesses
-# Currently, weakness and strength magnitude is not tracked
-# EX: it would be a neutral matchup if there is a 4x weakness one side, and a 2x on the other
-# there is also the problem of not handling non-stab moves that may have 4X coverage
-# by default remove from team as you really can't be certain what something with 4x weakness covers
-if config_data["exclude_4x_weak_from_team"]:
-    NUM_REMOVED = 0
-    for poke in dex.copy():
-        super_weakness_types = types[poke.type1].dse.intersection(types[poke.type2].dse)
-        if len(poke.typekey) > 2:
-            for atype in poke.typekey:
-                if len(atype.split("_")) > 1:
-                    ability_split = atype.split("_")
-                else:
-                    continue
-                ability_type = ability_split[0]
-                ability_effect = ability_split[1]
-                if ability_effect in ["Resist", "Immune"]:
-                    super_weakness_types.difference_update(ability_type)
-        if len(super_weakness_types) > 0:
-            dex.remove(poke)
-            NUM_REMOVED += 1
-
-print(f"\t{NUM_REMOVED} type combinations/pokemon removed for having 4x weaknesses")
-print("\t\tthis is controlled by exclude_4x_weak_from_team setting/parameter")
-
-# print the best types
-if args.rank_types:
+import pokedex
+from pokedex import config_data, typekey_effects, typekey_names, TYPE_BITS
+from engine import Engine, Query, region_choices
+from search import SearchStats
+
+
+def parse_args():
+    """parses the command line, asking again for regions that don't exist"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input_dex", default=["national"], nargs='*',
+                        help="the pokedex(es) to create teams from")
+    parser.add_argument("--stat_exclude", default=config_data["stat_exclude"],
+                        const=0, nargs='?', type=int,
+                        help="exclude pokemon with total base stat value below this number")
+    parser.add_argument("--rank_types_exclude", default=config_data["rank_types_exclude"],
+                        const=0, nargs='?', type=int,
+                        help="only evaluate the best this many types")
+    parser.add_argument("--rank_types", action='store_true', help="just rank types/pokemon")
+    parser.add_argument("--workers", default=config_data["workers"], type=int,
+                        help="number of processes to split the team search across")
+    parser.add_argument("--mode", default="exhaustive", choices=["exhaustive", "local"],
+                        help="try every team, or quickly improve teams by swapping pokemon, " +
+                        "for when there are too many pokemon left to try every team")
+    parser.add_argument("--time_budget", default=config_data["time_budget"], type=float,
+                        help="seconds to search for before reporting the best teams found, " +
+                        "0 for no limit. --mode local also stops once many perturbations in a " +
+                        "row find nothing better, which can be short of the best teams")
+    parser.add_argument("--seed", type=int, help="random seed for --mode local")
+    parser.add_argument("--keep_top", default=config_data["keep_top"], type=int,
+                        help="only keep this many of the best teams found, 0 to keep all")
+    parser.add_argument("--no_cache", action='store_true',
+                        help="rebuild type matchups instead of loading them from the cache folder")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="periodically save the progress of the team search to this file")
+    parser.add_argument("--resume", metavar="PATH",
+                        help="continue a team search from a --checkpoint file")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write counts of what the team search did at each depth " +
+                        "to this json file")
+    parser.add_argument("--what_if", metavar="PATH",
+                        help="start from the best teams of the last run saved in this file, " +
+                        "and save this run's best teams to it")
+    parser.add_argument("--verify", action='store_true',
+                        help="after the teams are printed, ask for pokemon and show how each " +
+                        "member of the best team matches up against them")
+    parser.add_argument("--all_regions", metavar="PATH",
+                        help="find the best team of every region and write them to this " +
+                        "markdown file, instead of using input_dex")
+
+    args = parser.parse_args()
+    if not isinstance(args.input_dex, list):
+        args.input_dex = [args.input_dex]
+    selected_regions = []
+    for region_input in args.input_dex:
+        while region_input not in region_choices:
+            region_input = input(f"{region_input} is invalid, " +
+                                 f"input region from {region_choices}: ")
+            if region_input not in region_choices:
+                print("incorrect input")
+        selected_regions.append(region_input)
+    args.input_dex = selected_regions
+    return args
+
+
+def print_rank_types(dex, dual_types):
+    """prints the types of the dex from best to worst type score"""
     print(f"there are {str(len(dex))} type combinations/pokemon left out of {str(len(dual_types))}")
     typescore_by_typekey = {}
     for poke in dex:
         typescore_by_typekey[poke.typekey] = dual_types[poke.typekey].score
-    sorted_typescore_by_typekey = sorted(typescore_by_typekey.items(), key=lambda x: x[1], reverse=True)
+    # types are printed in name order, sets of them are in a different order every run
+    sorted_typescore_by_typekey = sorted(typescore_by_typekey.items(),
+                                         key=lambda x: (-x[1], typekey_names(x[0])))
     print("Type  | Average Matchup Score")
     print("----- | -----")
     for entry in sorted_typescore_by_typekey:
-        for atype in entry[0]:
+        for atype in typekey_names(entry[0]):
             print(atype, end=" ")
         print(f" | {entry[1]/len(dual_types)}")
     print("matchup values:")
@@ -273,119 +91,25 @@ if args.rank_types:
     print("\tregularly effective stab move on opponent, opponent has super effective stab move: -3")
     print("\topponent resists all stab moves, opponent has super effective stab move: -4")
     print("\tneutral matchup: 0")
-    exit()
 
-NUM_REMOVED = 0
-for duo in combinations(dex.copy(), 2):
-    pokes = []
-    for poke in duo:
-        pokes.append(poke)
-    # don't let abilities effect this.
-    if len(pokes[0].typekey) + len(pokes[1].typekey) > 4:
-        continue
-    ssestabs0 = dual_types[pokes[0].typekey].ssestabs
-    ssestabs1 = dual_types[pokes[1].typekey].ssestabs
-    restabs0 = dual_types[pokes[0].typekey].restabs
-    restabs1 = dual_types[pokes[1].typekey].restabs
-    fmatchups0 = ssestabs0.union(restabs0)
-    fmatchups1 = ssestabs1.union(restabs1)
-    if ssestabs0 == ssestabs1:
-        if restabs0.issubset(restabs1):
-            dex.discard(pokes[0])
-            NUM_REMOVED += 1
-        elif restabs1.issubset(restabs0):
-            dex.discard(pokes[1])
-            NUM_REMOVED += 1
-    elif ssestabs0.issubset(ssestabs1):
-        if fmatchups0.issubset(fmatchups1):
-            dex.discard(pokes[0])
-            NUM_REMOVED += 1
-    elif ssestabs1.issubset(ssestabs0):
-        if fmatchups1.issubset(fmatchups0):
-            dex.discard(pokes[1])
-            NUM_REMOVED += 1
-print(f"\t{NUM_REMOVED} type combinations/pokemon removed for having" +
-      " alternatives that cover everything they do and more")
 
-if (args.rank_types_exclude != 0) and (len(dex) > args.rank_types_exclude):
-    typescores = []
-    for poke in dex:
-        typescores.append(dual_types[poke.typekey].score)
-    typescores.sort(reverse=True)
-    NUM_REMOVED = 0
-    for poke in dex.copy():
-        if dual_types[poke.typekey].score < typescores[args.rank_types_exclude]:
-            dex.remove(poke)
-            NUM_REMOVED += 1
-    print(f"\t{NUM_REMOVED} type combinations/pokemon removed for having" +
-          " too many more bad matchups than good ones")
-    print("\t\tthis is controlled by rank_types_exclude setting/parameter")
+def score_team(teams, team, debug, debug2):
+    """scores a team of pokemon found for teams, optionally printing it and its matchups"""
+    dual_types = teams.dual_types
+    poke_choices = teams.poke_choices
+    team_score = teams.score(team)
+    ssestabs_c = team_score.ssestabs_c
+    fallback_favorable_neutrals_c = team_score.fallback_favorable_neutrals_c
+    favorables2x_c = team_score.favorables2x_c
+    ssestabs2x_c = team_score.ssestabs2x_c
+    fallback_favorable_neutrals2x_c = team_score.fallback_favorable_neutrals2x_c
+    tscore = team_score.tscore
 
-print(f"there are {str(len(dex))} type combinations/pokemon left out of {str(len(dual_types))}")
-
-
-@dataclass(order=True, frozen=True)
-class Score:
-    """Class representing a Score assigned to a team of pokemon"""
-    # number of matchups with at least 1 pokemon
-    # that super effective stab without the opponent doing the same
-    ssestabs_c: int
-    # number of matchups with at least a neutral matchup in addition to
-    # the ssestab one, avoids wipes.
-    fallback_favorable_neutrals_c: int
-    # number of matchups with 2 pokemon with favorable matchups
-    favorables2x_c: int
-    # number of matchups with 2 pokemon with ssestab matchups
-    ssestabs2x_c: int
-    # number of matchupes with 2 or more neutral or better matchups
-    # in addition to the ssestab one
-    fallback_favorable_neutrals2x_c: int
-    # sum of type scores across team
-    tscore: int
-    # uniqueness: sum of pokedex number
-    unique_breaker: int
-
-
-def score_team(team, debug, debug2, ssestabs):
-    """scores a team"""
-    fallback_favorable_neutrals = set()
-    favorables2x = set()
-    ssestabs2x = set()
-    fallback_favorable_neutrals2x = set()
-    for score_typekey in dual_types:
-        ssestabs_c_part = 0
-        restabs_c_part = 0
-        neutrals_c_part = 0
-        for score_poke in team:
-            if score_typekey in dual_types[score_poke.typekey].ssestabs:
-                ssestabs_c_part += 1
-            elif score_typekey in dual_types[score_poke.typekey].restabs:
-                restabs_c_part += 1
-            elif score_typekey in dual_types[score_poke.typekey].neutrals:
-                neutrals_c_part += 1
-        if ssestabs_c_part > 0:
-            if restabs_c_part + ssestabs_c_part + neutrals_c_part - 1 > 1:
-                fallback_favorable_neutrals2x.add(score_typekey)
-                fallback_favorable_neutrals.add(score_typekey)
-            elif restabs_c_part + ssestabs_c_part + neutrals_c_part - 1 > 0:
-                fallback_favorable_neutrals.add(score_typekey)
-            if restabs_c_part + ssestabs_c_part - 1 > 0:
-                favorables2x.add(score_typekey)
-        if ssestabs_c_part > 1:
-            ssestabs2x.add(score_typekey)
-    ssestabs_c = len(ssestabs)
-    fallback_favorable_neutrals_c = len(fallback_favorable_neutrals)
-    favorables2x_c = len(favorables2x)
-    ssestabs2x_c = len(ssestabs2x)
-    fallback_favorable_neutrals2x_c = len(fallback_favorable_neutrals2x)
-
-    tscore = 0
-    unique_breaker = 0
+    ssestabs = set()
     restabs = set()
     neutrals = set()
     for score_poke in team:
-        tscore += dual_types[score_poke.typekey].score
-        unique_breaker += score_poke.number
+        ssestabs.update(dual_types[score_poke.typekey].ssestabs)
         restabs.update(dual_types[score_poke.typekey].restabs)
         neutrals.update(dual_types[score_poke.typekey].neutrals)
 
@@ -395,11 +119,8 @@ def score_team(team, debug, debug2, ssestabs):
         for debug_poke in sorted(team, key=lambda x: x.name):
             print(f"\t{debug_poke.name}\ttype score:{str(dual_types[debug_poke.typekey].score)}" +
                   f"\tbase stats:{str(debug_poke.tbstat)}\t{debug_poke.type1} {debug_poke.type2}")
-            if len(debug_poke.typekey) > 2:
-                for debug_type in debug_poke.typekey:
-                    if "_" in debug_type:
-                        print(f"\t\tAbility effect: {debug_type.split('_')[0]} " +
-                              f"{debug_type.split('_')[1]}")
+            for debug_type, debug_effect in typekey_effects(debug_poke.typekey):
+                print(f"\t\tAbility effect: {debug_type} {debug_effect}")
             if len(poke_choices[debug_poke.typekey]) > 1:
                 if len(poke_choices[debug_poke.typekey]) > 1:
                     print("\t\tAlternate choices of same type with lower stats: ", end="")
@@ -409,193 +130,132 @@ def score_team(team, debug, debug2, ssestabs):
                     print(" ")
 
     if debug2:
-        for debug_type in dual_types.keys()-ssestabs.union(restabs).union(neutrals):
-            print("\t\t\tbad matchup against: " + str(" ".join(sorted(debug_type))))
-        for debug_type in neutrals-ssestabs.union(restabs):
-            print("\t\t\tneutral matchup against: " + str(" ".join(sorted(debug_type))))
-        for debug_type in restabs-ssestabs:
-            print("\t\t\tonly sestab against: " + str(" ".join(sorted(debug_type))))
-
-    return Score(ssestabs_c, fallback_favorable_neutrals_c, favorables2x_c, ssestabs2x_c,
-                 fallback_favorable_neutrals2x_c, tscore, unique_breaker)
-
-
-include_names = set()
-for name in config_data["include_in_team_names"]:
-    include_names.add(name)
-included_pokemon = set()
-for include_name in include_names:
-    matches_found = set()
-    for poke in full_dex:
-        if include_name.lower() in poke.name.lower():
-            matches_found.add(poke)
-    if len(matches_found) == 0:
-        print(f"WARNING: no matching pokemon for {include_name} from include_in_team_names" +
-              "setting in settings file, no pokemon added to team for it")
-    elif len(matches_found) == 1:
-        included_pokemon.update(matches_found)
-    else:
-        EXACT_MATCH = False
-        for poke in matches_found:
-            if include_name.lower() == poke.name.lower():
-                included_pokemon.add(poke)
-                EXACT_MATCH = True
-        if EXACT_MATCH:
+        # in name order, typekeys are numbers
+        for debug_type in sorted(dual_types.keys()-ssestabs.union(restabs).union(neutrals),
+                                 key=typekey_names):
+            print("\t\t\tbad matchup against: " + " ".join(typekey_names(debug_type)))
+        for debug_type in sorted(neutrals-ssestabs.union(restabs), key=typekey_names):
+            print("\t\t\tneutral matchup against: " + " ".join(typekey_names(debug_type)))
+        for debug_type in sorted(restabs-ssestabs, key=typekey_names):
+            print("\t\t\tonly sestab against: " + " ".join(typekey_names(debug_type)))
+
+    return team_score
+
+
+def write_all_regions(engine, args, path):
+    """finds the best team of every region one after another, scoring the type matchups of all
+       of them together first, and writes their teams to a markdown file"""
+    queries = [Query(input_dex=[region], stat_exclude=args.stat_exclude,
+                     rank_types_exclude=args.rank_types_exclude, mode=args.mode,
+                     workers=args.workers, time_budget=args.time_budget, seed=args.seed,
+                     keep_top=args.keep_top) for region in region_choices]
+    engine.build_dexes(queries)
+    sections = []
+    for query in queries:
+        teams = engine.find_teams(query)
+        # a search stopped before its first task finished has no teams
+        if not teams.good_teams.teams:
+            sections.append(f"{query.input_dex[0]} dex\nno teams found\n")
             continue
-        print(f"WARNING: multiple matching pokemon for {include_name} from include_in_team_names" +
-              "setting in settings file")
-        match = matches_found.pop()
-        included_pokemon.add(match)
-        print(F"\tOnly including first one found: {match.name}")
+        ateam = {teams.members[member] for member in teams.good_teams.teams[teams.top_score]}
+        team_text = io.StringIO()
+        with contextlib.redirect_stdout(team_text):
+            score_team(teams, ateam, True, False)
+        sections.append(f"{query.input_dex[0]} dex\n```text\n{team_text.getvalue()}```\n")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(sections))
+    print(f"teams of {len(queries)} regions written to {path}")
+
+
+def main():
+    """finds and prints the best teams for the command line's query"""
+    start = timeit.default_timer()
+    args = parse_args()
+    engine = Engine(use_cache=not args.no_cache)
+    query = Query(input_dex=args.input_dex, stat_exclude=args.stat_exclude,
+                  rank_types_exclude=args.rank_types_exclude, mode=args.mode,
+                  workers=args.workers, time_budget=args.time_budget, seed=args.seed,
+                  keep_top=args.keep_top, checkpoint=args.checkpoint, resume=args.resume,
+                  stats=SearchStats() if args.profile else None, what_if=args.what_if)
+
+    if args.all_regions:
+        write_all_regions(engine, args, args.all_regions)
+        print("Runtime: ", timeit.default_timer() - start)
+        return
+
+    # print the best types
+    if args.rank_types:
+        dex, dual_types, _ = engine.shortlist(query)
+        print_rank_types(dex, dual_types)
+        return
+
+    teams = engine.find_teams(query)
+    if query.stats is not None:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            json.dump(query.stats.report(), f, indent=2)
+        print(f"search profile written to {args.profile}")
+
+    # print teams near to the high score
+    for _, ateam in teams.best_teams():
+        score_team(teams, ateam, True, True)
+        print()
 
-start_team = set()
-for poke in included_pokemon:
-    FOUND = False
-    for dpoke in dex.copy():
-        if poke.name == dpoke.name:
-            dex.remove(dpoke)
-            start_team.add(dpoke)
-            FOUND = True
+    stop = timeit.default_timer()
+    print("Runtime: ", stop - start)
+
+    # a search stopped before its first task finished has no teams
+    if not teams.good_teams.teams:
+        print("no teams found")
+        return
+    dual_types = teams.dual_types
+    ateam = {teams.members[member] for member in teams.good_teams.teams[teams.top_score]}
+    # names are looked up in the full dex, the loaded dex may have a copy with another typekey
+    loaded_by_name = ({poke.name: poke for poke in engine.load_dex(query)[0]}
+                      if args.verify else {})
+    while args.verify:
+        print("verify team by inputting a pokemon and seeing how each team member matches up")
+        try:
+            in_name = input("Enter pokemon name, or q to quit: ")
+        except EOFError:
             break
-        elif poke.typekey == dpoke.typekey:
-            print(f"including {dpoke.name} in team as a proxy for {poke.name}, " +
-                  "it is the same type with better stats")
-            dex.remove(dpoke)
-            start_team.add(dpoke)
-            FOUND = True
+        if in_name == "q":
             break
-    if not FOUND:
-        if poke.typekey not in dual_types:
-            print(f"WARNING: {poke.name} was found but not included in team, because it's type " +
-                  "was not evaluated, it may have been excluded for being a mega evolution or " +
-                  "for being from a wrong region?")
-        else:
-            start_team.add(poke)
-
-# variables to track percent completion along the way
-# makes it ~5% slower, but honestly worth
-num_combinations = comb(len(dex), 6-len(start_team))
-A_PERC = int(num_combinations/10000)
-A_PERC = max(A_PERC, 1)
-print("there are " + str(num_combinations) + " teams to assess")
-PROG = 0
-
-# Keep track of the best teams so we can show progress and output them later
-GOOD_TEAMS = {}
-MAX_SSESTABS = -1
-TOP_SCORE = Score(0, 0, 0, 0, 0, 0, 0)
-
-
-def score(in_dex, in_ssestabs, in_team, team_size):
-    """makes and scores all possible teams of 6 by adding 1 pokemon at a time,
-       only continuing on to make full team if adding that pokemon improved the team.
-       only fully scoring if the team is near the best team"""
-    # pylint: disable=global-statement
-    # pylint: disable=global-variable-not-assigned
-    # use global variables to track progress and the best teams
-    global PROG
-    global GOOD_TEAMS
-    global TOP_SCORE
-    global MAX_SSESTABS
-    while len(in_dex) + len(in_team) >= team_size:
-        spoke = in_dex.pop()
-        out_ssestabs = in_ssestabs | dual_types[spoke.typekey].ssestabs
-        if len(out_ssestabs) == len(in_ssestabs):
-            PROG += comb(len(in_dex), team_size - (len(in_team) + 1))
-            continue
-        out_team = in_team.copy()
-        out_team.add(spoke)
-        if len(out_team) < team_size:
-            score(in_dex.copy(), out_ssestabs, out_team, team_size)
-        else:
-            PROG += 1
-            ssestabs_c = len(out_ssestabs)
-            if ssestabs_c < (MAX_SSESTABS - 1):
+        found_poke = pokedex.name_index.find(in_name)
+        if found_poke is None:
+            matches_found = pokedex.name_index.matching(in_name)
+            if len(matches_found) == 0:
+                print(f"No matching pokemon for {in_name}")
                 continue
-            team_score = score_team(out_team, False, False, out_ssestabs)
-            if TOP_SCORE < team_score:
-                TOP_SCORE = team_score
-                MAX_SSESTABS = ssestabs_c
-            # save teams near to the high score
-            GOOD_TEAMS[team_score] = out_team
-            # if PROG % A_PERC == 0 and PROG > 0:
-            elapsed_time = timeit.default_timer() - start
-            estimated_time_left = ((elapsed_time/(PROG/num_combinations)) - elapsed_time)
-            print(f"{round(100*PROG/num_combinations, 2):.2f}% of the way" +
-                  f"done, current max ssestabs: {MAX_SSESTABS}, time elapsed: " +
-                  f"{round(elapsed_time)}, est. time remaining: " +
-                  f"{round(estimated_time_left)}         \r", end='')
-
-
-start_ssestabs = set()
-for poke in start_team:
-    start_ssestabs.update(dual_types[poke.typekey].ssestabs)
-if len(start_team) == 6:
-    TEAM_SCORE = score_team(start_team, False, False, start_ssestabs)
-    TOP_SCORE = TEAM_SCORE
-    MAX_SSESTABS = len(start_ssestabs)
-    GOOD_TEAMS[TEAM_SCORE] = start_team
-else:
-    score(dex.copy(), start_ssestabs, start_team, 6)
-print()
-
-# print teams near to the high score
-for ascore in sorted(GOOD_TEAMS.keys()):
-    if ascore.ssestabs_c > TOP_SCORE.ssestabs_c - 1:
-        ateam = GOOD_TEAMS[ascore].copy()
-        team_ssestabs = set()
+            found_poke = matches_found[0]
+            if len(matches_found) > 1:
+                print(f"WARNING: multiple matching pokemon for {in_name}")
+                print(F"\tOnly verifying first one found: {found_poke.name}")
+        found_poke = loaded_by_name.get(found_poke.name, found_poke)
+        indtype = found_poke.typekey
+        if indtype not in dual_types:
+            # score_dex drops ability copies whose ability changes no matchup
+            indtype &= TYPE_BITS
+        if indtype not in dual_types:
+            print("This pokemon was not included in matchups evaluated. " +
+                  "Is it from another region maybe?")
+            continue
+        print(f"{found_poke.name}: {found_poke.type1} {found_poke.type2}")
         for poke in ateam:
-            team_ssestabs.update(dual_types[poke.typekey].ssestabs)
-        score_team(ateam, True, True, team_ssestabs)
-        print()
-
-stop = timeit.default_timer()
-print("Runtime: ", stop - start)
-
-ateam = GOOD_TEAMS[TOP_SCORE]
-while False:
-    print("verify team by inputting a pokemon and seeing how each team member matches up")
-    in_name = input("Enter pokemon name, or q to quit: ")
-    if in_name == "q":
-        break
-    matches_found = set()
-    FOUND_POKE = None
-    for poke in full_dex:
-        if in_name.lower() in poke.name.lower():
-            matches_found.add(poke)
-    if len(matches_found) == 0:
-        print(f"No matching pokemon for {in_name}")
-        continue
-    elif len(matches_found) == 1:
-        FOUND_POKE = matches_found.pop()
-    else:
-        EXACT_MATCH = False
-        for poke in matches_found:
-            if in_name.lower() == poke.name.lower():
-                FOUND_POKE = poke
-                EXACT_MATCH = True
-        if not EXACT_MATCH:
-            print(f"WARNING: multiple matching pokemon for {in_name} from include_in_team_names")
-            FOUND_POKE = matches_found.pop()
-            print(F"\tOnly including first one found: {FOUND_POKE.name}")
-    indtype = FOUND_POKE.typekey
-    if indtype not in dual_types:
-        print("This pokemon was not included in matchups evaluated." +
-              "Is it from another region maybe?")
-        continue
-    print(f"{FOUND_POKE.name}: {FOUND_POKE.type1} {FOUND_POKE.type2}")
-    for poke in ateam:
-        print(poke.name + "\t" + poke.type1 + " " + poke.type2)
-        print("\tmatchup score: " + str(dual_types[poke.typekey].matchups[indtype]))
-        if indtype in dual_types[poke.typekey].d_oe:
-            print("\t\toffensively regularly effective")
-        if indtype in dual_types[poke.typekey].d_ose:
-            print("\t\toffensively super effective")
-        if indtype in dual_types[poke.typekey].d_one:
-            print("\t\toffensively not very effective")
-        if indtype in dual_types[poke.typekey].d_de:
-            print("\t\tdefensively regularly effective")
-        if indtype in dual_types[poke.typekey].d_dse:
-            print("\t\tdefensively super effective, as in vulnerable")
-        if indtype in dual_types[poke.typekey].d_dne:
-            print("\t\tdefensively not very effective, as in resistant")
+            print(poke.name + "\t" + poke.type1 + " " + poke.type2)
+            print("\tmatchup score: " + str(dual_types[poke.typekey].matchups[indtype]))
+            if indtype in dual_types[poke.typekey].d_oe:
+                print("\t\toffensively regularly effective")
+            if indtype in dual_types[poke.typekey].d_ose:
+                print("\t\toffensively super effective")
+            if indtype in dual_types[poke.typekey].d_one:
+                print("\t\toffensively not very effective")
+            if indtype in dual_types[poke.typekey].d_de:
+                print("\t\tdefensively regularly effective")
+            if indtype in dual_types[poke.typekey].d_dse:
+                print("\t\tdefensively super effective, as in vulnerable")
+            if indtype in dual_types[poke.typekey].d_dne:
+                print("\t\tdefensively not very effective, as in resistant")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,66 @@
-"""initializes Type and Pokemon classes, creates full set of pokemon,
-   determines pokemon in each region,
+"""initializes Type and Pokemon classes, creates full set of pokemon and
+   determines pokemon in each region when they are first used,
    provides function for filling in type effectiveness given a set of pokemon"""
+import contextlib
 import os
 import sys
-from dataclasses import dataclass, field
-import copy
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field, replace
+from functools import cache, cached_property
+import hashlib
+import marshal
 import re
+from itertools import combinations
 import tomllib
 
 
+# matchup codes stored in a MatchupMatrix, defensively weak, neutral, strong * 3 +
+# offensively weak, neutral, strong
+DW_OW, DW_ON, DW_OS, DN_OW, DN_ON, DN_OS, DS_OW, DS_ON, DS_OS = range(9)
+# value of each matchup code, in code order
+MATCHUP_VALUES = (-4, -3, 0, -1, 0, 3, 0, 1, 4)
+
+
+class MatchupMatrix:
+    """T x T int8 matchup codes between every pair of dual types,
+       row is the type facing the matchup, column is the opponent's type"""
+
+    def __init__(self, typekeys):
+        self.typekeys = list(typekeys)  # index to typekey
+        self.index = {typekey: i for i, typekey in enumerate(self.typekeys)}  # typekey to index
+        self.size = len(self.typekeys)
+        self.codes = array("b", bytes(self.size * self.size))
+
+    def row(self, index):
+        """matchup codes a type faces against every type, by column index"""
+        return self.codes[index * self.size:(index + 1) * self.size]
+
+    def code(self, typekey, opponent_typekey):
+        """matchup code of typekey facing opponent_typekey"""
+        return self.codes[self.index[typekey] * self.size + self.index[opponent_typekey]]
+
+
+def matchup_view(*codes):
+    """lazily derived set of dual types whose matchup code is one of codes"""
+    def view(self):
+        return {self.matrix.typekeys[col]
+                for col, code in enumerate(self.matrix.row(self.index))
+                if code in codes and self.columns >> col & 1}
+    return cached_property(view)
+
+
+def matchup_mask(*codes):
+    """lazily derived bitmask of dual types whose matchup code is one of codes"""
+    def mask(self):
+        bits = 0
+        for col, code in enumerate(self.matrix.row(self.index)):
+            if code in codes:
+                bits |= 1 << col
+        return bits & self.columns
+    return cached_property(mask)
+
+
 @dataclass
 class Type:
     """Class representing a Pokemon Type combination"""
@@ -22,53 +74,85 @@ class Type:
     dse: set = field(default_factory=set)  # defensively super effective, as in vulnerable
     dne: set = field(default_factory=set)  # defensively not very effective, as in resistant
 
-    # sets of dual types as frozenset of 2 types as strings, where no second type is "NONE"
-    d_oe: set = field(default_factory=set)  # offensively (regularly) effective
-    d_ose: set = field(default_factory=set)  # offensively super effective against
-    d_one: set = field(default_factory=set)  # offensively not very effective against
-    d_de: set = field(default_factory=set)  # defensively (regularly) effective
-    d_dse: set = field(default_factory=set)  # defensively super effective, as in vulnerable
-    d_dne: set = field(default_factory=set)  # defensively not very effective, as in resistant
+    # the matchup matrix this dual type is a row of, filled by score_dex,
+    # index is the row and column of this type, bit is 1 << index
+    matrix: MatchupMatrix = None
+    index: int = -1
+    bit: int = 0
+    score: int = 0  # sum of matchups values, values explained later
+    # bitmask of the matrix columns this type faces, all of them unless this is a view()
+    columns: int = -1
+
+    # multiplier each type in TYPE_NAMES order does against this type, abilities included,
+    # and the bitmask of TYPE_NAMES indices this type attacks with
+    defense: list = field(default_factory=list)
+    stab: int = 0
+
+    # everything below is derived from the matchup matrix on first use
+
+    # sets of typekeys of dual types
+    d_oe = matchup_view(DW_ON, DN_ON, DS_ON)  # offensively (regularly) effective
+    d_ose = matchup_view(DW_OS, DN_OS, DS_OS)  # offensively super effective against
+    d_one = matchup_view(DW_OW, DN_OW, DS_OW)  # offensively not very effective against
+    d_de = matchup_view(DN_OW, DN_ON, DN_OS)  # defensively (regularly) effective
+    d_dse = matchup_view(DW_OW, DW_ON, DW_OS)  # defensively super effective, as in vulnerable
+    d_dne = matchup_view(DS_OW, DS_ON, DS_OS)  # defensively not very effective, as in resistant
 
     # members are d[w|n|s]_o[w|n|s] defensively weak, neutral, strong _
     # offensively weak, neutral, strong
-    dw_ow: set = field(default_factory=set)
-    dw_on: set = field(default_factory=set)
-    dw_os: set = field(default_factory=set)
-    dn_ow: set = field(default_factory=set)
-    dn_on: set = field(default_factory=set)
-    dn_os: set = field(default_factory=set)
-    ds_ow: set = field(default_factory=set)
-    ds_on: set = field(default_factory=set)
-    ds_os: set = field(default_factory=set)
+    dw_ow = matchup_view(DW_OW)
+    dw_on = matchup_view(DW_ON)
+    dw_os = matchup_view(DW_OS)
+    dn_ow = matchup_view(DN_OW)
+    dn_on = matchup_view(DN_ON)
+    dn_os = matchup_view(DN_OS)
+    ds_ow = matchup_view(DS_OW)
+    ds_on = matchup_view(DS_ON)
+    ds_os = matchup_view(DS_OS)
 
     # safe super effective stabs - highest priority metric
-    ssestabs: set = field(default_factory=set)
+    ssestabs = matchup_view(DN_OS, DS_OS)
     # resist, effective stabs - second priority metric
-    restabs: set = field(default_factory=set)
-    neutrals: set = field(default_factory=set)
-
-    # dictionary of matchup values a type faces, values explained later
-    matchups: dict = field(default_factory=dict)
-    score: int = 0  # sum of above dictionary entries, values explained later
-
-
-@dataclass
+    restabs = matchup_view(DS_ON)
+    neutrals = matchup_view(DN_ON, DW_OS, DS_OW)
+
+    # the same three sets as int bitmasks, one bit per dual_types key
+    ssestabs_mask = matchup_mask(DN_OS, DS_OS)
+    restabs_mask = matchup_mask(DS_ON)
+    neutrals_mask = matchup_mask(DN_ON, DW_OS, DS_OW)
+
+    @cached_property
+    def matchups(self):
+        """dictionary of matchup values a type faces, values explained later"""
+        return {self.matrix.typekeys[col]: MATCHUP_VALUES[code]
+                for col, code in enumerate(self.matrix.row(self.index))
+                if self.columns >> col & 1}
+
+    def view(self, columns):
+        """this type only facing the dual types in the columns bitmask of its matrix,
+           such as the dual types of a region when the matrix has those of many regions"""
+        return replace(self, columns=columns,
+                       score=sum(MATCHUP_VALUES[code]
+                                 for col, code in enumerate(self.matrix.row(self.index))
+                                 if columns >> col & 1))
+
+
+@dataclass(slots=True, order=True)
 class Pokemon:
-    """Class representing a Pokemon"""
+    """Class representing a Pokemon, ordered by name as names are unique"""
     # pylint: disable=too-many-instance-attributes
     name: str
     number: int
     type1: str  # all caps string of type name
     type2: str
-    typekey: frozenset = field(init=False)
+    typekey: int = field(init=False)  # its types and ability effects, see make_typekey
     tbstat: int  # total base stats
     ability1: str
     ability2: str
     abilityh: str
 
     def __post_init__(self):
-        self.typekey = frozenset({self.type1, self.type2})
+        self.typekey = make_typekey(self.type1, self.type2)
 
     def __str__(self):
         return self.name
@@ -77,149 +161,242 @@ class Pokemon:
         return hash(self.name)
 
 
-def add_ability(name, in_dex, include_hidden, effect1, effect2=""):
-    '''adds new pokemon to dex, or updates in place, for effects of abilities'''
-    for poke in in_dex.copy():
-        make_new = ((poke.ability1 == name and poke.ability2 != "") or
-                    (poke.ability2 == name) or
-                    (include_hidden and poke.abilityh == name) or
-                    (include_hidden and poke.ability1 == name and poke.abilityh != ""))
-        if make_new:
-            new_ability_poke = copy.deepcopy(poke)
-            new_ability_poke.name = poke.name + " - " + name
-            if effect2 != "":
-                new_ability_poke.typekey = frozenset({poke.type1, poke.type2, effect1, effect2})
-            else:
-                new_ability_poke.typekey = frozenset({poke.type1, poke.type2, effect1})
-            in_dex.add(copy.deepcopy(new_ability_poke))
-        elif poke.ability1 == name:
-            poke.name = poke.name + " - " + name
-            if effect2 != "":
-                poke.typekey = frozenset({poke.type1, poke.type2, effect1, effect2})
-            else:
-                poke.typekey = frozenset({poke.type1, poke.type2, effect1})
-
-
-# dictionary of type names as strings to their Type class variable
-types = {
-    "NORMAL": Type(),
-    "FIRE": Type(),
-    "WATER": Type(),
-    "ELECTRIC": Type(),
-    "GRASS": Type(),
-    "ICE": Type(),
-    "FIGHTING": Type(),
-    "POISON": Type(),
-    "GROUND": Type(),
-    "FLYING": Type(),
-    "PSYCHIC": Type(),
-    "BUG": Type(),
-    "ROCK": Type(),
-    "GHOST": Type(),
-    "DRAGON": Type(),
-    "DARK": Type(),
-    "STEEL": Type(),
-    "FAIRY": Type(),
-    "NONE": Type()
-}
+def ability_variants(poke, abilities, include_hidden):
+    """the pokemon for each ability it can have that changes its type matchups, named
+       "name - ability", and the pokemon itself unless its only ability is one of those.
+       abilities is a dictionary of ability name to its effects"""
+    names = [poke.ability1, poke.ability2] + ([poke.abilityh] if include_hidden else [])
+    names = [name for index, name in enumerate(names) if name and name not in names[:index]]
+    variants = [] if len(names) == 1 and names[0] in abilities else [poke]
+    for name in names:
+        if name in abilities:
+            variant = Pokemon(name=poke.name + " - " + name, number=poke.number,
+                              type1=poke.type1, type2=poke.type2, tbstat=poke.tbstat,
+                              ability1=poke.ability1, ability2=poke.ability2,
+                              abilityh=poke.abilityh)
+            variant.typekey = make_typekey(poke.type1, poke.type2, abilities[name])
+            variants.append(variant)
+    return variants
+
+
+# name parts of mega evolutions and of forms only in some regions, each is a form tag bit
+FORM_NAME_PARTS = ("Mega ", "Ultra ", "Alola", "Galar", "Husui", "Paldea", "Blaze Breed",
+                   "Combat Breed", "Aqua Breed")
+
+
+def form_bits(name_parts):
+    """the form tag bits of name parts from FORM_NAME_PARTS"""
+    return sum(1 << FORM_NAME_PARTS.index(part) for part in set(name_parts))
+
+
+def form_tags(name):
+    """the form tag bits of the FORM_NAME_PARTS in a pokemon's name, ignoring case"""
+    return form_bits(part for part in FORM_NAME_PARTS if part.lower() in name.lower())
+
+
+@dataclass(slots=True)
+class DexStore:
+    """the full dex in one order, with indexes by region, form tag and total base stats,
+       so pokemon are selected with set operations instead of comparing names"""
+    pokes: list  # every pokemon of the full dex
+    tags: list  # form tags of each pokemon, see form_tags
+    regions: dict  # region name to the indexes of its pokemon
+    tag_index: dict  # form tag bit to the indexes of the pokemon with it
+    stat_order: list  # indexes of the pokemon from lowest to highest total base stats
+
+    def region(self, region_names):
+        """indexes of the pokemon in any of the regions"""
+        return set().union(*(self.regions[region] for region in region_names))
+
+    def tagged(self, bits):
+        """indexes of the pokemon with any of the form tag bits"""
+        return set().union(*(self.tag_index.get(bit, ()) for bit in range(bits.bit_length())
+                             if bits >> bit & 1))
+
+    def below_stat(self, tbstat):
+        """names of the pokemon with total base stats below tbstat"""
+        end = bisect_left(self.stat_order, tbstat, key=lambda index: self.pokes[index].tbstat)
+        return {self.pokes[index].name for index in self.stat_order[:end]}
+
+
+class NameIndex:
+    """Class finding pokemon by their name or a part of it, ignoring case. Names are kept in a
+       dictionary for exact lookups, and each three letters of a name in an index of the
+       pokemon with them, so a part of a name only has to be checked against the few names
+       that have all of its three letters"""
+
+    def __init__(self, pokes):
+        self.pokes = sorted(pokes, key=lambda x: x.name)
+        self.names = [poke.name.lower() for poke in self.pokes]
+        self.exact = {name: index for index, name in enumerate(self.names)}
+        self.trigrams = {}  # three lowercase letters to the indexes of the names with them
+        for index, name in enumerate(self.names):
+            for start in range(len(name) - 2):
+                self.trigrams.setdefault(name[start:start + 3], set()).add(index)
+
+    def find(self, name):
+        """the pokemon with this name, or None"""
+        index = self.exact.get(name.lower())
+        return None if index is None else self.pokes[index]
+
+    def matching(self, name_part):
+        """the pokemon with names containing name_part, in name order"""
+        name_part = name_part.lower()
+        if len(name_part) < 3:
+            candidates = range(len(self.names))
+        else:
+            trigrams = [self.trigrams.get(name_part[start:start + 3], set())
+                        for start in range(len(name_part) - 2)]
+            candidates = sorted(set.intersection(*sorted(trigrams, key=len)))
+        return [self.pokes[index] for index in candidates if name_part in self.names[index]]
+
+
+# every type in chart order, NONE is the missing second type of a single typed pokemon
+TYPE_NAMES = ("NORMAL", "FIRE", "WATER", "ELECTRIC", "GRASS", "ICE", "FIGHTING", "POISON",
+              "GROUND", "FLYING", "PSYCHIC", "BUG", "ROCK", "GHOST", "DRAGON", "DARK", "STEEL",
+              "FAIRY", "NONE")
+TYPE_INDEX = {type_name: index for index, type_name in enumerate(TYPE_NAMES)}
+
+# a typekey is an int with the TYPE_INDEX bit of each of a pokemon's types set,
+# then a bit for each type one of its ability effects is for, one TYPE_NAMES wide group of bits
+# for each effect. Effects are written as strings of a type and an effect (ex. "FIRE_Resist")
+EFFECTS = ("Resist", "Immune", "Stab")
+TYPE_BITS = (1 << len(TYPE_NAMES)) - 1
+
+
+def effect_bit(effect_name):
+    """the typekey bit of an ability effect as a string (ex. "FIRE_Resist")"""
+    atype, _, effect = effect_name.partition("_")
+    return 1 << (len(TYPE_NAMES) * (EFFECTS.index(effect) + 1) + TYPE_INDEX[atype])
+
+
+def make_typekey(type1, type2, effect_names=()):
+    """the typekey of a pokemon's two types and its ability effects as strings"""
+    typekey = 1 << TYPE_INDEX[type1] | 1 << TYPE_INDEX[type2]
+    for effect_name in effect_names:
+        typekey |= effect_bit(effect_name)
+    return typekey
+
+
+def typekey_effects(typekey):
+    """the ability effects of a typekey as (type, effect) string pairs, in TYPE_NAMES order"""
+    return [(atype, effect) for group, effect in enumerate(EFFECTS, start=1)
+            for index, atype in enumerate(TYPE_NAMES)
+            if typekey >> (len(TYPE_NAMES) * group + index) & 1]
+
+
+def typekey_names(typekey):
+    """the types and ability effects of a typekey as strings (ex. "FIRE_Resist"),
+       in name order"""
+    return sorted([atype for index, atype in enumerate(TYPE_NAMES) if typekey >> index & 1] +
+                  [atype + "_" + effect for atype, effect in typekey_effects(typekey)])
+
+
+# damage multiplier of an offensive type (row) against a defensive type (column)
+CHART = [[1.0] * len(TYPE_NAMES) for _ in TYPE_NAMES]
 
 
 def is_se(otype, *detypes):  # otype is offensize type
-    """fills Type variables with their OSE and DSE taking a type,
+    """fills the chart with 2x multipliers taking a type,
        then each type that it is super effective against"""
     for detype in detypes:  # detype are defending types
-        types[otype].ose.add(detype)
-        types[detype].dse.add(otype)
+        CHART[TYPE_INDEX[otype]][TYPE_INDEX[detype]] = 2.0
 
 
 def is_ne(otype, *detypes):
-    """fills Type variables with their ONE and DNE taking a type,
+    """fills the chart with 0.5x multipliers taking a type,
        then each type that it is not effective against"""
     for detype in detypes:
-        types[otype].one.add(detype)
-        types[detype].dne.add(otype)
+        CHART[TYPE_INDEX[otype]][TYPE_INDEX[detype]] = 0.5
+
+
+def is_immune(otype, *detypes):
+    """fills the chart with 0x multipliers taking a type,
+       then each type that is immune to it"""
+    for detype in detypes:
+        CHART[TYPE_INDEX[otype]][TYPE_INDEX[detype]] = 0.0
+
+
+def split_multipliers(multipliers):
+    """returns the set of type names above and the set below a neutral multiplier"""
+    return ({TYPE_NAMES[i] for i, multiplier in enumerate(multipliers) if multiplier > 1},
+            {TYPE_NAMES[i] for i, multiplier in enumerate(multipliers) if multiplier < 1})
+
+
+def multipliers_mask(multipliers, strong):
+    """returns the bitmask of type indices above (strong) or below a neutral multiplier"""
+    mask = 0
+    for i, multiplier in enumerate(multipliers):
+        if multiplier > 1 if strong else multiplier < 1:
+            mask |= 1 << i
+    return mask
+
+
+def typekey_multipliers(typekey):
+    """returns the stab type indices of a typekey, and the multipliers each type
+       does against it, including the changes of its abilities"""
+    stab = []
+    defense = [1.0] * len(TYPE_NAMES)
+    resist, immune, stab_effect = (typekey >> (len(TYPE_NAMES) * group) & TYPE_BITS
+                                   for group in range(1, len(EFFECTS) + 1))
+    for index in range(len(TYPE_NAMES)):
+        if typekey >> index & 1:
+            stab.append(index)
+            for oindex, row in enumerate(CHART):
+                defense[oindex] *= row[index]
+        if stab_effect >> index & 1:
+            stab.append(index)
+        if resist >> index & 1:
+            defense[index] *= 0.5
+    for index in range(len(TYPE_NAMES)):
+        if immune >> index & 1:
+            defense[index] = 0.0
+    return stab, defense
+
+
+def typekey_type(typekey):
+    """the Type of a typekey, with its effectiveness against single types filled in"""
+    stab, defense = typekey_multipliers(typekey)
+    # offensively as effective against a type as the best of our stab types,
+    # NONE is neutral against everything so single types are never not effective
+    offense = [max(CHART[stab_index][index] for stab_index in stab)
+               for index in range(len(TYPE_NAMES))]
+    ose, one = split_multipliers(offense)
+    # defensively the product of both types, after ability resistances and immunities
+    dse, dne = split_multipliers(defense)
+    return Type(oe=alltypes - ose - one, ose=ose, one=one, de=alltypes - dse - dne, dse=dse,
+                dne=dne, defense=defense, stab=sum(1 << index for index in set(stab)))
 
 
 def score_dex(dex, dual_types):
     """uses set of pokemen dex to fill type effectiveness for each type
-       in dual_types dictionary of typekey to type class object"""
+       in dual_types dictionary of typekey to type class object.
+       Stab abilities count on both sides of a matchup, offensively for the pokemon with them
+       and defensively for the pokemon facing them"""
     # fill in set of single type effectivenesses for each pokemon
     # oe,one,ose,de,dne,dse
     for poke in dex:
         if poke.typekey not in dual_types:
-            # offensively super effective against a type if either type is
-            ose = types[poke.type1].ose.union(types[poke.type2].ose)
-            # offensively not effective against a type if both types are
-            one = types[poke.type1].one.intersection(types[poke.type2].one)
-            # defensively super effective against a type if either type is,
-            # and the other does not resist it
-            dse = types[poke.type1].dse.union(types[poke.type2].dse)
-            dse.difference_update(types[poke.type1].dne)
-            dse.difference_update(types[poke.type2].dne)
-            # defensively not effective against a type if either type is,
-            # and the other is not weak to it
-            dne = types[poke.type1].dne.union(types[poke.type2].dne)
-            dne.difference_update(types[poke.type1].dse)
-            dne.difference_update(types[poke.type2].dse)
-            # immunities take precedent
-            if poke.type1 == "GHOST" or poke.type2 == "GHOST":
-                dne.add("NORMAL")
-                dne.add("FIGHTING")
-            if poke.type1 == "GROUND" or poke.type2 == "GROUND":
-                dne.add("ELECTRIC")
-            if poke.type1 == "FLYING" or poke.type2 == "FLYING":
-                dne.add("GROUND")
-            if poke.type1 == "DARK" or poke.type2 == "DARK":
-                dne.add("PSYCHIC")
-            if poke.type1 == "STEEL" or poke.type2 == "STEEL":
-                dne.add("POISON")
-            if poke.type1 == "FAIRY" or poke.type2 == "FAIRY":
-                dne.add("DRAGON")
-            if len(poke.typekey) > 2:
-                for abtype in poke.typekey:
-                    if len(abtype.split("_")) > 1:
-                        ability_split = abtype.split("_")
-                    else:
-                        continue
-                    ability_type = ability_split[0]
-                    ability_effect = ability_split[1]
-                    if ability_effect == "Resist":
-                        if ability_type in dse:
-                            dse.difference_update(ability_type)
-                        else:
-                            dne.add(ability_type)
-                    if ability_effect == "Immune":
-                        dse.difference_update(ability_type)
-                        dne.add(ability_type)
-                    if ability_effect == "Stab":
-                        one.difference_update(types[ability_type].ose)
-                        ose.update(types[ability_type].ose)
-            dual_types[poke.typekey] = Type(ose=ose, one=one, dse=dse, dne=dne)
-
-    for btype in dual_types.values():
-        btype.oe = alltypes - btype.ose - btype.one
-        btype.de = alltypes - btype.dse - btype.dne
+            dual_types[poke.typekey] = typekey_type(poke.typekey)
 
     # updates pokemon that were included because of their ability,
     # but their ability does not change anything
     remove_from_dual_types = set()
     for poke in dex.copy():
-        if len(poke.typekey) > 2:
-            typekey_no_ability = frozenset({poke.type1, poke.type2})
+        if poke.typekey & ~TYPE_BITS:
+            typekey_no_ability = poke.typekey & TYPE_BITS
+            # pokemon whose only ability is this one have no copy without it
+            base_type = dual_types.get(typekey_no_ability) or typekey_type(typekey_no_ability)
             ability_type_effectiveness = [dual_types[poke.typekey].oe,
                                           dual_types[poke.typekey].one,
                                           dual_types[poke.typekey].ose,
                                           dual_types[poke.typekey].de,
                                           dual_types[poke.typekey].dne,
                                           dual_types[poke.typekey].dse]
-            base_type_effectiveness = [dual_types[typekey_no_ability].oe,
-                                       dual_types[typekey_no_ability].one,
-                                       dual_types[typekey_no_ability].ose,
-                                       dual_types[typekey_no_ability].de,
-                                       dual_types[typekey_no_ability].dne,
-                                       dual_types[typekey_no_ability].dse]
+            base_type_effectiveness = [base_type.oe, base_type.one, base_type.ose,
+                                       base_type.de, base_type.dne, base_type.dse]
             if ability_type_effectiveness == base_type_effectiveness:
-                remove_from_dual_types.add(poke.typekey.copy())
+                remove_from_dual_types.add(poke.typekey)
                 # remove it if this pokemon has two mutliple abilities, and this version was a copy
                 # added due to the ability that had no positive effect
                 removed = False
@@ -228,89 +405,41 @@ def score_dex(dex, dual_types):
                             inner_poke.typekey == typekey_no_ability):
                         dex.remove(poke)
                         removed = True
+                        break
                 # if this pokemon's only ability had no effect, revert the typekey to not have the
                 # ability anymore - later on will combine all same types pokemon.
+                # the pokemon may be shared with the full dex, so it is replaced with a copy
                 if not removed:
-                    poke.typekey = typekey_no_ability.copy()
+                    dex.remove(poke)
+                    reverted = replace(poke)
+                    reverted.typekey = typekey_no_ability
+                    dex.add(reverted)
+                    dual_types.setdefault(typekey_no_ability, base_type)
     for typekey in remove_from_dual_types:
         del dual_types[typekey]
-    # fill dual_types with more advanced info (type effectivenesses against every dual type)
-    # d_oe,d_one,d_ose,d_de,d_dne,d_dse
-    for poke in dex:
-        for dtypekey, dtype in dual_types.items():
-            if "NONE" in dtypekey and len(dtypekey) < 3:
-                for adtype in dtypekey:
-                    if adtype != "NONE":
-                        if adtype in dual_types[poke.typekey].ose:
-                            dual_types[poke.typekey].d_ose.add(dtypekey)
-                        if adtype in dual_types[poke.typekey].one:
-                            dual_types[poke.typekey].d_one.add(dtypekey)
-                        if adtype in dual_types[poke.typekey].oe:
-                            dual_types[poke.typekey].d_oe.add(dtypekey)
-                        if adtype in dual_types[poke.typekey].dse:
-                            dual_types[poke.typekey].d_dse.add(dtypekey)
-                        if adtype in dual_types[poke.typekey].dne:
-                            dual_types[poke.typekey].d_dne.add(dtypekey)
-                        if adtype in dual_types[poke.typekey].de:
-                            dual_types[poke.typekey].d_de.add(dtypekey)
-            else:
-                dtypes = []
-                for adtype in dtypekey:
-                    if "_" not in adtype:
-                        dtypes.append(adtype)
-                dtype1 = dtypes[0]
-                dtype2 = dtypes[1]
-                ptype = dual_types[poke.typekey]
-                # offensively super effective against a type
-                # if either of our types are in it's weak list
-                if poke.type1 in dtype.dse or poke.type2 in dtype.dse:
-                    ptype.d_ose.add(dtypekey)
-                # offensively not effective against a type
-                # if both of our types are in it's resist list
-                if poke.type1 in dtype.dne and poke.type2 in dtype.dne:
-                    ptype.d_one.add(dtypekey)
-                # defensively super effective against a type
-                # if either of the other type's types are in our weak list
-                if dtype1 in ptype.dse or dtype2 in ptype.dse:
-                    ptype.d_dse.add(dtypekey)
-                # defensively not effective against a type
-                # if both of the other type's types are in our resist list
-                if dtype1 in ptype.dne and dtype2 in ptype.dne:
-                    ptype.d_dne.add(dtypekey)
-                if len(poke.typekey) > 2:
-                    for aptype in poke.typekey:
-                        if len(aptype.split("_")) > 1:
-                            ability_split = aptype.split("_")
-                        else:
-                            continue
-                        ability_type = ability_split[0]
-                        ability_effect = ability_split[1]
-                        if ability_effect == "Resist":
-                            if (dtype1 in ptype.dse and
-                                    dtype2 in ptype.dse):
-                                continue
-                            if ability_type in ptype.d_dse:
-                                ptype.d_dse.difference_update(ability_type)
-                            else:
-                                ptype.d_dne.add(ability_type)
-                        elif ability_effect == "Immune":
-                            ptype.d_dse.difference_update(ability_type)
-                            ptype.d_dne.add(ability_type)
-                        elif ability_effect == "Stab":
-                            if ability_type in dtype.dse:
-                                ptype.d_one.difference_update(dtypekey)
-                                ptype.d_ose.add(dtypekey)
-                            elif ability_type in dtype.de:
-                                ptype.d_one.difference_update(dtypekey)
-    for poke in dex:
-        dual_types[poke.typekey].d_oe = (dual_types.keys() - dual_types[poke.typekey].d_ose
-                                         - dual_types[poke.typekey].d_one)
-        dual_types[poke.typekey].d_de = (dual_types.keys() - dual_types[poke.typekey].d_dse
-                                         - dual_types[poke.typekey].d_dne)
-
-    # fill the xx_xx variables, they hold a list of matchups a pokemon/Type combination faces.
-    for poke in dex:
-        for dtype in dual_types:
+    # fill the matchup matrix, each code is the matchup a pokemon/Type combination faces
+    matrix = MatchupMatrix(dual_types)
+    # bitmasks of the types each typekey is weak to and resists, and the types it attacks
+    # with, where NONE only counts offensively. An opponent's Stab ability type is one of the
+    # types it attacks with, so a pokemon weak to it faces that opponent defensively weak
+    weak_masks = [multipliers_mask(mtype.defense, True) for mtype in dual_types.values()]
+    resist_masks = [multipliers_mask(mtype.defense, False) for mtype in dual_types.values()]
+    attack_masks = [mtype.stab & ~(1 << TYPE_INDEX["NONE"]) for mtype in dual_types.values()]
+    for row, ptype in enumerate(dual_types.values()):
+        offset = row * matrix.size
+        for col in range(len(dual_types)):
+            # offensively super effective against a type
+            # if any of our stab types are in it's weak list
+            o_strong = ptype.stab & weak_masks[col]
+            # offensively not effective against a type
+            # if all of our stab types are in it's resist list
+            o_weak = not ptype.stab & ~resist_masks[col]
+            # defensively super effective against a type
+            # if any of the other type's types are in our weak list
+            d_weak = attack_masks[col] & weak_masks[row]
+            # defensively not effective against a type
+            # if all of the other type's types are in our resist list
+            d_strong = not attack_masks[col] & ~resist_masks[row]
             # value based on
             # dw_ow_matchup is worth -4
             # dw_on_matchup is worth -3
@@ -321,61 +450,83 @@ def score_dex(dex, dual_types):
             # ds_ow_matchup is worth 0
             # ds_on_matchup is worth 1
             # ds_os_matchup is worth 4
-
-            # if defensively neutral (+ 0)
-            if dtype in dual_types[poke.typekey].d_de:
-                # if offensively neutral (+ 0)
-                if dtype in dual_types[poke.typekey].d_oe:
-                    dual_types[poke.typekey].dn_on.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = 0
-                    dual_types[poke.typekey].neutrals.add(dtype)
-                # if offensively weak (-1)
-                elif dtype in dual_types[poke.typekey].d_one:
-                    dual_types[poke.typekey].dn_ow.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = -1
-                # if offensively strong (+3)
-                elif dtype in dual_types[poke.typekey].d_ose:
-                    dual_types[poke.typekey].dn_os.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = 3
-                    dual_types[poke.typekey].ssestabs.add(dtype)
-            # if defensively weak (-3)
-            elif dtype in dual_types[poke.typekey].d_dse:
-                # if offensively neutral (+ 0)
-                if dtype in dual_types[poke.typekey].d_oe:
-                    dual_types[poke.typekey].dw_on.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = -3
-                # if offensively weak (-1)
-                elif dtype in dual_types[poke.typekey].d_one:
-                    dual_types[poke.typekey].dw_ow.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = -4
-                # if offensively strong (+3)
-                elif dtype in dual_types[poke.typekey].d_ose:
-                    dual_types[poke.typekey].dw_os.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = 0
-                    dual_types[poke.typekey].neutrals.add(dtype)
-            # if defensively strong (+1)
-            elif dtype in dual_types[poke.typekey].d_dne:
-                # if offensively neutral (+ 0)
-                if dtype in dual_types[poke.typekey].d_oe:
-                    dual_types[poke.typekey].ds_on.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = 1
-                    dual_types[poke.typekey].restabs.add(dtype)
-                # if offensively weak (-1)
-                elif dtype in dual_types[poke.typekey].d_one:
-                    dual_types[poke.typekey].ds_ow.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = 0
-                    dual_types[poke.typekey].neutrals.add(dtype)
-                # if offensively strong (+3)
-                elif dtype in dual_types[poke.typekey].d_ose:
-                    dual_types[poke.typekey].ds_os.add(dtype)
-                    dual_types[poke.typekey].matchups[dtype] = 4
-                    dual_types[poke.typekey].ssestabs.add(dtype)
-
-    for mtype in dual_types:
-        for amatchup in dual_types[mtype].matchups:
-            dual_types[mtype].score += dual_types[mtype].matchups[amatchup]
-
-    return dex, dual_types
+            # weakness is checked before strength, as both can be true
+            if d_weak:
+                code = DW_OW
+            elif d_strong:
+                code = DS_OW
+            else:
+                code = DN_OW
+            if o_weak:
+                pass
+            elif o_strong:
+                code += 2
+            else:
+                code += 1
+            matrix.codes[offset + col] = code
+
+    for index, mtype in enumerate(dual_types.values()):
+        mtype.matrix = matrix
+        mtype.index = index
+        mtype.bit = 1 << index
+        mtype.score = sum(MATCHUP_VALUES[code] for code in matrix.row(index))
+
+    return dex, dual_types, matrix
+
+
+def hypothetical_dex(tbstat):
+    """returns a dex of a pokemon of every type combination, and of every type and ability
+       combination that exists, all with tbstat base stats"""
+    dex = set()
+    for number, (atype, btype) in enumerate(combinations(sorted(alltypes), 2), start=1):
+        dex.add(Pokemon(name=atype+" "+btype, number=number, type1=atype, type2=btype,
+                        tbstat=tbstat, ability1="", ability2="", abilityh=""))
+    ability_poke_typekeys = set()
+    for poke in sorted(load_full_dex(), key=lambda x: x.name):
+        if poke.typekey & ~TYPE_BITS and poke.typekey not in ability_poke_typekeys:
+            effect_names = [name for name in typekey_names(poke.typekey) if "_" in name]
+            ability_poke = Pokemon(name=f'{poke.type1} {poke.type2} ability: ' +
+                                   " ".join(effect_names), number=poke.number,
+                                   type1=poke.type1, type2=poke.type2, tbstat=tbstat,
+                                   ability1=poke.ability1, ability2=poke.ability2,
+                                   abilityh=poke.abilityh)
+            ability_poke.typekey = poke.typekey
+            ability_poke_typekeys.add(poke.typekey)
+            dex.add(ability_poke)
+    return dex
+
+
+def remove_dominated(dex, dual_types):
+    """removes pokemon that have alternatives that cover everything they do and more,
+       returns the number removed"""
+    # a pokemon is dominated if another has every ssestab it has, and every favorable matchup,
+    # only pokemon with at least as many ssestabs can dominate, so they are bucketed by that count.
+    # identical pokemon keep the best type score, then the first by name
+    # don't let abilities effect this.
+    dominance = sorted((poke for poke in dex if not poke.typekey & ~TYPE_BITS),
+                       key=lambda poke: (-dual_types[poke.typekey].score, poke.name))
+    ssestab_buckets = {}
+    for order, poke in enumerate(dominance):
+        ssestabs_mask = dual_types[poke.typekey].ssestabs_mask
+        favorables_mask = ssestabs_mask | dual_types[poke.typekey].restabs_mask
+        ssestab_buckets.setdefault(ssestabs_mask.bit_count(), []).append(
+            (order, poke, ssestabs_mask, favorables_mask))
+    num_removed = 0
+    for count, bucket in ssestab_buckets.items():
+        dominators = [other for other_count, other_bucket in ssestab_buckets.items()
+                      if other_count >= count for other in other_bucket]
+        for order, poke, ssestabs_mask, favorables_mask in bucket:
+            for other_order, _, other_ssestabs, other_favorables in dominators:
+                if (ssestabs_mask & ~other_ssestabs or favorables_mask & ~other_favorables or
+                        other_order == order):
+                    continue
+                if (other_order > order and ssestabs_mask == other_ssestabs and
+                        favorables_mask == other_favorables):
+                    continue
+                dex.remove(poke)
+                num_removed += 1
+                break
+    return num_removed
 
 
 default_settings_path = os.path.join(os.path.dirname(__file__), "default_settings.toml")
@@ -387,56 +538,44 @@ if os.path.isfile(settings_path):
         custom_config_data = tomllib.load(f)
     config_data.update(custom_config_data)
 
-full_dex = set()
-data_path = os.path.join(os.path.dirname(__file__), "data")
-if not os.path.isfile(os.path.join(data_path, "pokedex.csv")):
-    sys.exit(f"pokedex.csv does not exist in {os.mkdir(data_path)}," +
-             "try running scrape.py to generate data")
-with open(os.path.join(data_path, "pokedex.csv"), "r", encoding="utf-8") as f:
-    for pokecsv in f:
-        s = pokecsv.split(",")
-        full_dex.add(Pokemon(name=s[0], number=int(s[1]), type1=s[2].upper(), type2=s[3].upper(),
-                             tbstat=int(s[4]), ability1=s[4], ability2=s[5], abilityh=s[6]))
-region_nums = {}
-region_num_regex = re.compile("(.+)(_national_dex_numbers\\.txt)")
-for path in os.listdir(data_path):
-    match = re.match(region_num_regex, path)
-    if match:
-        region_nums[match.group(1)] = set()
-        with open(os.path.join(data_path, match.group(0)), encoding="utf-8") as f:
-            for num in f:
-                region_nums[match.group(1)].add(int(num))
-
 is_se("BUG", "PSYCHIC", "DARK", "GRASS")
 is_ne("BUG", "FIRE", "FIGHTING", "POISON", "FLYING", "GHOST", "STEEL", "FAIRY")
 is_se("DARK", "PSYCHIC", "GHOST")
 is_ne("DARK", "FIGHTING", "DARK", "FAIRY")
 is_se("DRAGON", "DRAGON")
-is_ne("DRAGON", "STEEL", "FAIRY")
+is_ne("DRAGON", "STEEL")
+is_immune("DRAGON", "FAIRY")
 is_se("ELECTRIC", "WATER", "FLYING")
-is_ne("ELECTRIC", "ELECTRIC", "GRASS", "DRAGON", "GROUND")
+is_ne("ELECTRIC", "ELECTRIC", "GRASS", "DRAGON")
+is_immune("ELECTRIC", "GROUND")
 is_se("FAIRY", "FIGHTING", "DRAGON", "DARK")
 is_ne("FAIRY", "FIRE", "POISON", "STEEL")
 is_se("FIGHTING", "NORMAL", "ICE", "ROCK", "DARK", "STEEL")
-is_ne("FIGHTING", "POISON", "FLYING", "PSYCHIC", "BUG", "FAIRY", "GHOST")
+is_ne("FIGHTING", "POISON", "FLYING", "PSYCHIC", "BUG", "FAIRY")
+is_immune("FIGHTING", "GHOST")
 is_se("FIRE", "GRASS", "ICE", "BUG", "STEEL")
 is_ne("FIRE", "FIRE", "WATER", "ROCK", "DRAGON")
 is_se("FLYING", "GRASS", "FIGHTING", "BUG")
 is_ne("FLYING", "ELECTRIC", "ROCK", "STEEL")
 is_se("GHOST", "PSYCHIC", "GHOST")
-is_ne("GHOST", "DARK", "NORMAL")
+is_ne("GHOST", "DARK")
+is_immune("GHOST", "NORMAL")
 is_se("GRASS", "WATER", "GROUND", "ROCK")
 is_ne("GRASS", "FIRE", "GRASS", "POISON", "FLYING", "BUG", "DRAGON", "STEEL")
 is_se("GROUND", "FIRE", "ELECTRIC", "POISON", "ROCK", "STEEL")
-is_ne("GROUND", "GRASS", "BUG", "FLYING")
+is_ne("GROUND", "GRASS", "BUG")
+is_immune("GROUND", "FLYING")
 is_se("ICE", "GRASS", "GROUND", "FLYING", "DRAGON")
 is_ne("ICE", "FIRE", "WATER", "ICE", "STEEL")
 # is_se("NORMAL",)
-is_ne("NORMAL", "ROCK", "STEEL", "GHOST")
+is_ne("NORMAL", "ROCK", "STEEL")
+is_immune("NORMAL", "GHOST")
 is_se("POISON", "GRASS", "FAIRY")
-is_ne("POISON", "POISON", "GROUND", "ROCK", "GHOST", "STEEL")
+is_ne("POISON", "POISON", "GROUND", "ROCK", "GHOST")
+is_immune("POISON", "STEEL")
 is_se("PSYCHIC", "FIGHTING", "POISON")
-is_ne("PSYCHIC", "PSYCHIC", "STEEL", "DARK")
+is_ne("PSYCHIC", "PSYCHIC", "STEEL")
+is_immune("PSYCHIC", "DARK")
 is_se("ROCK", "FIRE", "ICE", "FLYING", "BUG")
 is_ne("ROCK", "FIGHTING", "GROUND", "STEEL")
 is_se("STEEL", "ICE", "ROCK", "FAIRY")
@@ -444,26 +583,170 @@ is_ne("STEEL", "FIRE", "WATER", "ELECTRIC", "STEEL")
 is_se("WATER", "FIRE", "GROUND", "ROCK")
 is_ne("WATER", "GRASS", "WATER", "DRAGON")
 
-if config_data["assess_abilities"]:
-    add_ability("Sap Sipper", full_dex, config_data["assess_hidden_abilities"], "GRASS_Immune")
-    add_ability("Storm Drain", full_dex, config_data["assess_hidden_abilities"], "WATER_Immune")
-    add_ability("Water Absorb", full_dex, config_data["assess_hidden_abilities"], "WATER_Immune")
-    add_ability("Motor Drive", full_dex, config_data["assess_hidden_abilities"], "ELECTRIC_Immune")
-    add_ability("Volt Absorb", full_dex, config_data["assess_hidden_abilities"], "ELECTRIC_Immune")
-    add_ability("Thick Fat", full_dex, config_data["assess_hidden_abilities"],
-                "FIRE_Resist", "ICE_Resist")
-    add_ability("Levitate", full_dex, config_data["assess_hidden_abilities"], "GROUND_Immune")
-    add_ability("Earth Eater", full_dex, config_data["assess_hidden_abilities"], "GROUND_Immune")
-    add_ability("Flash Fire", full_dex, config_data["assess_hidden_abilities"], "FIRE_Immune")
-    add_ability("Well-Baked Body", full_dex, config_data["assess_hidden_abilities"], "FIRE_Immune")
-    add_ability("Water-Bubble", full_dex, config_data["assess_hidden_abilities"], "FIRE_Resist")
-    add_ability("Heatproof", full_dex, config_data["assess_hidden_abilities"], "FIRE_Resist")
-    add_ability("Steelworker", full_dex, config_data["assess_hidden_abilities"], "STEEL_Stab")
-
-alltypes = set()
-for atype in types:
-    alltypes.add(atype)
-
-for atypekey, atype in types.items():
-    atype.oe = alltypes - atype.ose - atype.one
-    atype.de = alltypes - atype.dse - atype.dne
+data_path = os.path.join(os.path.dirname(__file__), "data")
+cache_path = os.path.join(os.path.dirname(__file__), "cache")
+
+
+def read_abilities():
+    """dictionary of ability name to the effects it has on type matchups, from abilities.csv,
+       effects are a type and Resist, Immune or Stab (ex. "FIRE_Resist")"""
+    abilities = {}
+    with open(os.path.join(data_path, "abilities.csv"), "r", encoding="utf-8") as f:
+        for abilitycsv in f:
+            name, *effects = abilitycsv.rstrip("\n").split(",")
+            for effect in effects:
+                atype, _, kind = effect.partition("_")
+                if atype not in TYPE_INDEX or kind not in ("Resist", "Immune", "Stab"):
+                    sys.exit(f"{effect} of {name} in abilities.csv is not a type and " +
+                             "Resist, Immune or Stab")
+            abilities[name] = effects
+    return abilities
+
+
+def read_full_dex():
+    """reads every pokemon in pokedex.csv, with a copy for each ability in abilities.csv
+       it can have, returns them as a set"""
+    dex = set()
+    if not os.path.isfile(os.path.join(data_path, "pokedex.csv")):
+        sys.exit(f"pokedex.csv does not exist in {os.mkdir(data_path)}," +
+                 "try running scrape.py to generate data")
+    abilities = read_abilities() if config_data["assess_abilities"] else {}
+    with open(os.path.join(data_path, "pokedex.csv"), "r", encoding="utf-8") as f:
+        for pokecsv in f:
+            s = pokecsv.rstrip("\n").split(",")
+            poke = Pokemon(name=s[0], number=int(s[1]), type1=s[2].upper(), type2=s[3].upper(),
+                           tbstat=int(s[4]), ability1=s[5], ability2=s[6], abilityh=s[7])
+            dex.update(ability_variants(poke, abilities, config_data["assess_hidden_abilities"]))
+    return dex
+
+
+def remove_stale_caches(path, prefix):
+    """removes the files next to path named prefix, a sha256 digest and path's extension,
+       other than path. They were saved for data files, code or settings that have changed
+       since, so no run will load them again"""
+    folder, name = os.path.split(path)
+    stale = re.compile(re.escape(prefix) + "[0-9a-f]{64}" + re.escape(os.path.splitext(name)[1]))
+    for file_name in os.listdir(folder):
+        if file_name != name and stale.fullmatch(file_name):
+            # another run may have removed it already
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(folder, file_name))
+
+
+def full_dex_cache_path():
+    """path of the saved full dex, named by a hash of what it depends on: pokedex.csv,
+       abilities.csv, the region files, this file, the ability settings, and the python
+       version, as marshal's format changes between versions"""
+    key = hashlib.sha256()
+    key_paths = [os.path.join(data_path, "pokedex.csv"),
+                 os.path.join(data_path, "abilities.csv"), __file__]
+    key_paths += region_files().values()
+    for key_path in key_paths:
+        with open(key_path, "rb") as key_file:
+            key.update(key_file.read())
+    key.update(repr([config_data["assess_abilities"],
+                     config_data["assess_hidden_abilities"], sys.version_info[:2]]).encode())
+    return os.path.join(cache_path, "full_dex_" + key.hexdigest() + ".marshal")
+
+
+# Pokemon fields saved as columns of the full dex, in the order Pokemon() takes them
+POKEMON_COLUMNS = ("name", "number", "type1", "type2", "tbstat", "ability1", "ability2",
+                   "abilityh", "typekey")
+
+
+def compile_dex_store(dex):
+    """the DexStore of a set of pokemon, in name order"""
+    pokes = sorted(dex, key=lambda x: x.name)
+    tags = [form_tags(poke.name) for poke in pokes]
+    regions = {region: [index for index, poke in enumerate(pokes) if poke.number in nums]
+               for region, nums in load_region_nums().items()}
+    tag_index = {}
+    for index, poke_tags in enumerate(tags):
+        for bit in range(poke_tags.bit_length()):
+            if poke_tags >> bit & 1:
+                tag_index.setdefault(bit, []).append(index)
+    stat_order = sorted(range(len(pokes)), key=lambda index: pokes[index].tbstat)
+    return DexStore(pokes, tags, regions, tag_index, stat_order)
+
+
+@cache
+def load_dex_store():
+    """the DexStore of every pokemon, built on first use. Its columns and indexes are saved
+       to the cache folder after abilities are applied, so later runs load them with one read"""
+    dex_path = full_dex_cache_path()
+    if os.path.isfile(dex_path):
+        with open(dex_path, "rb") as f:
+            columns = marshal.loads(f.read())
+        pokes = []
+        for *values, typekey in zip(*(columns[column] for column in POKEMON_COLUMNS)):
+            poke = Pokemon(*values)
+            poke.typekey = typekey
+            pokes.append(poke)
+        dex_store = DexStore(pokes, columns["tags"], columns["regions"], columns["tag_index"],
+                             columns["stat_order"])
+    else:
+        dex_store = compile_dex_store(read_full_dex())
+        columns = {column: [getattr(poke, column) for poke in dex_store.pokes]
+                   for column in POKEMON_COLUMNS}
+        columns.update(tags=dex_store.tags, regions=dex_store.regions,
+                       tag_index=dex_store.tag_index, stat_order=dex_store.stat_order)
+        os.makedirs(cache_path, exist_ok=True)
+        with open(dex_path + ".tmp", "wb") as f:
+            f.write(marshal.dumps(columns))
+        os.replace(dex_path + ".tmp", dex_path)
+        remove_stale_caches(dex_path, "full_dex_")
+    return dex_store
+
+
+@cache
+def load_full_dex():
+    """the set of every pokemon, built on first use, see load_dex_store"""
+    return set(load_dex_store().pokes)
+
+
+@cache
+def load_name_index():
+    """the NameIndex of every pokemon, built on first use"""
+    return NameIndex(load_dex_store().pokes)
+
+
+def region_files():
+    """dictionary of region name to its national dex numbers file, in name order"""
+    region_num_regex = re.compile("(.+)(_national_dex_numbers\\.txt)")
+    return {match.group(1): os.path.join(data_path, match.group(0))
+            for match in map(region_num_regex.fullmatch, sorted(os.listdir(data_path))) if match}
+
+
+@cache
+def load_region_nums():
+    """dictionary of region name to the national dex numbers in it, read on first use"""
+    region_nums = {}
+    for region, path in region_files().items():
+        with open(path, encoding="utf-8") as f:
+            region_nums[region] = set(map(int, f.read().split()))
+    return region_nums
+
+
+def __getattr__(name):
+    """full_dex, dex_store, name_index and region_nums are loaded when first used,
+       not on import"""
+    if name == "full_dex":
+        return load_full_dex()
+    if name == "dex_store":
+        return load_dex_store()
+    if name == "name_index":
+        return load_name_index()
+    if name == "region_nums":
+        return load_region_nums()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+alltypes = set(TYPE_NAMES)
+
+# dictionary of type names as strings to their single type Type class variable
+types = {}
+for type_name, chart_row in zip(TYPE_NAMES, CHART):
+    aose, aone = split_multipliers(chart_row)
+    adse, adne = split_multipliers([orow[TYPE_INDEX[type_name]] for orow in CHART])
+    types[type_name] = Type(oe=alltypes - aose - aone, ose=aose, one=aone,
+                        de=alltypes - adse - adne, dse=adse, dne=adne)
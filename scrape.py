@@ -1,22 +1,61 @@
 '''scrapes each individual pokemons pokemondb page for info'''
+import argparse
+import email.utils
+import hashlib
+import json
 import os
 import re
 import sys
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 
-options = Options()
-options.headless = True
-options.add_argument("--log-level=3")
-options.add_argument("--window-size=1920,1080")
-driver = webdriver.Chrome(options=options, service=Service(ChromeDriverManager().install()))
+BASE_URL = "https://pokemondb.net"
+# lists every pokemon once, with a link to its page
+INDEX_PATH = "/pokedex/national"
+USER_AGENT = "pokemon-type-optimizer scraper"
+REGION_DEXNAMES = {"Red/Blue/Yellow": "gen1_kanto",
+                   "Yellow/Red/Blue": "gen1_kanto",
+                   "Gold/Silver/Crystal": "gen2_johto",
+                   "Crystal/Gold/Silver": "gen2_johto",
+                   "Ruby/Sapphire/Emerald": "gen3_hoenn",
+                   "FireRed/LeafGreen": "gen3_kanto",
+                   "Diamond/Pearl": "gen4_sinnoh",
+                   "Platinum": "gen4_sinnoh2",
+                   "HeartGold/SoulSilver": "gen4_johto",
+                   "Black/White": "gen5_unova",
+                   "Black 2/White 2": "gen5_unova2",
+                   "X/Y — Central Kalos": "gen6_kalos",
+                   "X/Y — Coastal Kalos": "gen6_kalos",
+                   "X/Y — Mountain Kalos": "gen6_kalos",
+                   "Omega Ruby/Alpha Sapphire": "gen6_hoenn",
+                   "Sun/Moon — Alola dex": "gen7_alola",
+                   "U.Sun/U.Moon — Alola dex": "gen7_alola2",
+                   "Let's Go Pikachu/Let's Go Eevee": "gen7_kanto",
+                   "Sword/Shield": "gen8_galar",
+                   "The Isle of Armor": "gen8_galar2",
+                   "The Crown Tundra": "gen8_galar3",
+                   "Brilliant Diamond/Shining Pearl": "gen8_sinnoh",
+                   "Legends: Arceus": "gen8_hisui",
+                   "Scarlet/Violet": "gen9_paldea",
+                   "The Teal Mask": "gen9_paldea2",
+                   "The Indigo Disk": "gen9_paldea3",
+                   }
+data_path = os.path.join(os.path.dirname(__file__), "data")
+cache_path = os.path.join(os.path.dirname(__file__), "cache")
+
+
+def new_region_nums():
+    '''region to the set of national dex numbers in it, for every region'''
+    return {dexname: set() for dexname in REGION_DEXNAMES.values()}
 
 
-def get_variation_data(panel, name, region_nums, region_dexnames):
-    '''get data for one variation/tab in page of the pokemon'''
+def get_variation_data(name, pokedex_text, base_stats_text, region_nums):
+    '''the pokedex.csv row of one variation/tab of a pokemon, from the text of its pokedex data
+       and base stats tables, one table row per line. adds its number to the regions it is in'''
     number = 0
     type1 = "NONE"
     type2 = "NONE"
@@ -24,154 +63,434 @@ def get_variation_data(panel, name, region_nums, region_dexnames):
     ability1 = ""
     ability2 = ""
     abilityh = ""
-    xpath = ".//h2[text()='Pokédex data']/following::table[@class='vitals-table']"
-    pokedex_data = panel.find_element(By.XPATH, xpath)
-    for line in pokedex_data.text.splitlines():
+    for line in pokedex_text.splitlines():
         sline = line.split()
         # print(" ".join(sline))
         if "National" == sline[0]:
             number = sline[2]
         if "Type" == sline[0]:
-            type1 = sline[1]
+            type1 = sline[1].upper()
             if len(sline) == 3:
-                type2 = sline[2]
+                type2 = sline[2].upper()
         if "Abilities" == sline[0]:
             ability1 = " ".join(sline[2:])
         if "2." == sline[0]:
             ability2 = " ".join(sline[1:])
         if "ability)" == sline[-1]:
             abilityh = " ".join(sline[:-2])
-    xpath = ".//h2[text()='Base stats']/following::table[@class='vitals-table']"
-    base_stats = panel.find_element(By.XPATH, xpath)
-    for line in base_stats.text.splitlines():
+    for line in base_stats_text.splitlines():
         sline = line.split()
         # print(" ".join(sline))
         if sline[0] == "Total":
             tbstat = int(sline[1])
     pokedata = f"{name},{int(number)},{type1},{type2},{tbstat},{ability1},{ability2},{abilityh}"
     print(pokedata)
-    POKEDEX_FILE.write(pokedata+"\n")
-    dexes = pokedex_data.text.split("Local № ", 1)[1].splitlines()
+    # pokemon new to the site may not be in a regional dex yet
+    dexes = []
+    if "Local № " in pokedex_text:
+        dexes = pokedex_text.split("Local № ", 1)[1].splitlines()
     dexes_regex = re.compile("(\\d+ \\()(.+)(\\))")
     for dex in dexes:
         match = re.match(dexes_regex, dex)
         if not match:
             sys.exit(f"\nERR: {dex} not able to be parsed into a region name")
-        elif match.group(2) not in region_dexnames:
+        elif match.group(2) not in REGION_DEXNAMES:
             sys.exit(f"\nERR: {match.group(2)} not recognized as a region name")
         else:
-            region_nums[region_dexnames[match.group(2)]].add(int(number))
-
-
-def get_pokemon_data(page, region_nums, region_dexnames):
-    '''get data for one pokemon'''
-    h1 = page.find_element(By.TAG_NAME, "h1")
-    name = h1.text
-    base_name = name
-    pdata_header_xpath = "//h2[text()='Pokédex data']"
-    if len(driver.find_elements(By.XPATH, pdata_header_xpath)) < 1:
-        print(f"No pokemon found on page {page}")
-    elif len(driver.find_elements(By.XPATH, pdata_header_xpath)) == 1:
-        single_tab_xpath = (pdata_header_xpath +
-                            "/ancestor-or-self::" +
-                            "div[@class='tabset-basics sv-tabs-wrapper sv-tabs-onetab']")
-        single_tab = page.find_element(By.XPATH, single_tab_xpath)
-        get_variation_data(single_tab, name, region_nums, region_dexnames)
+            region_nums[REGION_DEXNAMES[match.group(2)]].add(int(number))
+    return pokedata
+
+
+class PokemonPageParser(HTMLParser):
+    '''collects the name, the form tabs and the text of the vitals tables of a pokemon page'''
+
+    def __init__(self):
+        super().__init__()
+        self.name = ""
+        self.tabs = {}  # panel id to the text of the tab showing it
+        self.panels = {}  # panel id, None outside of tabs, to table heading to table text
+        self.divs = []  # class of each open div, innermost last
+        self.basics = -1  # index in divs of the tabs of the pokemon's forms, -1 outside of them
+        self.panel = None  # id of the panel being read
+        self.panel_div = -1  # index in divs of that panel
+        self.heading = ""  # the last h2 read
+        self.capture = None  # tag whose text is being read
+        self.tab_id = None  # panel id of the tab being read
+        self.text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if tag == "div":
+            self.divs.append(classes)
+            if "tabset-basics" in classes and self.basics < 0:
+                self.basics = len(self.divs) - 1
+            elif "sv-tabs-panel" in classes and self.basics >= 0 and self.panel_div < 0:
+                self.panel = attrs.get("id")
+                self.panel_div = len(self.divs) - 1
+        elif tag in ("h1", "h2") and self.capture is None:
+            self.capture = tag
+            self.text = []
+        elif (tag == "a" and self.basics >= 0 and self.capture is None and
+              "sv-tabs-tab-list" in self.divs[-1] and attrs.get("href", "").startswith("#")):
+            self.capture = tag
+            self.tab_id = attrs["href"][1:]
+            self.text = []
+        elif tag == "table" and "vitals-table" in classes and self.basics >= 0:
+            self.capture = tag
+            self.text = []
+        elif self.capture == "table" and tag in ("th", "td"):
+            self.text.append(" ")
+        elif self.capture == "table" and tag in ("tr", "br"):
+            self.text.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "div" and self.divs:
+            self.divs.pop()
+            if len(self.divs) <= self.panel_div:
+                self.panel = None
+                self.panel_div = -1
+            if len(self.divs) <= self.basics:
+                self.basics = -1
+            return
+        if tag != self.capture:
+            return
+        text = "".join(self.text)
+        if tag == "h1" and not self.name:
+            self.name = " ".join(text.split())
+        elif tag == "h2":
+            self.heading = " ".join(text.split())
+        elif tag == "a":
+            self.tabs[self.tab_id] = " ".join(text.split())
+        elif tag == "table":
+            lines = [" ".join(line.split()) for line in text.splitlines()]
+            self.panels.setdefault(self.panel, {})[self.heading] = "\n".join(
+                line for line in lines if line)
+        self.capture = None
+
+    def handle_data(self, data):
+        if self.capture is not None:
+            self.text.append(data)
+
+
+class IndexPageParser(HTMLParser):
+    '''collects the links to pokemon pages of the national dex page, in order'''
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if (tag == "a" and "ent-name" in (attrs.get("class") or "").split() and
+                attrs.get("href") and attrs["href"] not in self.links):
+            self.links.append(attrs["href"])
+
+
+def get_pokemon_data(url, html, region_nums):
+    '''the pokedex.csv rows of one pokemon page, one for each of its forms'''
+    page = PokemonPageParser()
+    page.feed(html)
+    page.close()
+    variations = [(panel, tables) for panel, tables in page.panels.items()
+                  if "Pokédex data" in tables]
+    if len(variations) < 1:
+        print(f"No pokemon found on page {url}")
+    rows = []
+    for panel, tables in variations:
+        name = page.name
+        if len(variations) > 1:
+            tab = page.tabs.get(panel, page.name)
+            name = tab if page.name in tab else page.name + " - " + tab
+        rows.append(get_variation_data(name, tables["Pokédex data"],
+                                       tables.get("Base stats", ""), region_nums))
+    return rows
+
+
+def page_path(url, page_cache):
+    '''the file in the page cache that the page at url is saved to'''
+    return os.path.join(page_cache, *urllib.parse.urlparse(url).path.strip("/").split("/"))
+
+
+def download(url, headers=None, retries=3):
+    '''the html and response headers of url, retrying server errors.
+       the html is None when headers made it a conditional request and the page is unchanged'''
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, **(headers or {})})
+    for attempt in range(retries):
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.read().decode("utf-8"), response.headers
+        except urllib.error.HTTPError as error:
+            if error.code == 304:
+                return None, error.headers
+            if error.code < 500 or attempt == retries - 1:
+                raise
+        except urllib.error.URLError:
+            if attempt == retries - 1:
+                raise
+        time.sleep(2 ** attempt)
+    return None, {}
+
+
+def save_page(url, page_cache, html):
+    '''saves a fetched page to the page cache'''
+    page_file = page_path(url, page_cache)
+    os.makedirs(os.path.dirname(page_file), exist_ok=True)
+    # written whole or not at all, so a stopped run never leaves half a page in the cache
+    with open(page_file + ".tmp", "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(page_file + ".tmp", page_file)
+
+
+def fetch_page(url, page_cache):
+    '''the html of url, read from the page cache if it was fetched before,
+       otherwise fetched and saved there so later runs don't need the network'''
+    page_file = page_path(url, page_cache)
+    if os.path.isfile(page_file):
+        with open(page_file, "r", encoding="utf-8") as f:
+            return f.read()
+    html, _ = download(url)
+    save_page(url, page_cache, html)
+    return html
+
+
+def write_data(data_dir, rows, region_nums):
+    '''replaces pokedex.csv and the region national dex number files in data_dir with the ones
+       for rows and region_nums, leaving files that are the same alone.
+       every changed file is written before any is replaced, so a failed run changes none'''
+    os.makedirs(data_dir, exist_ok=True)
+    contents = {"pokedex.csv": "".join(row + "\n" for row in rows)}
+    for dexname, dexnums in region_nums.items():
+        contents[dexname + "_national_dex_numbers.txt"] = "".join(
+            str(poke_number) + "\n" for poke_number in sorted(dexnums))
+        print(f"{len(dexnums)} pokemon in pokedex for {dexname}")
+    changed = []
+    for file_name, content in contents.items():
+        data_file = os.path.join(data_dir, file_name)
+        old_content = None
+        if os.path.isfile(data_file):
+            with open(data_file, "r", encoding="utf-8") as f:
+                old_content = f.read()
+        if old_content == content:
+            continue
+        if file_name == "pokedex.csv":
+            old_rows = set((old_content or "").splitlines())
+            new_rows = set(content.splitlines())
+            print(f"{len(new_rows - old_rows)} pokedex.csv rows added or changed, " +
+                  f"{len(old_rows - new_rows)} removed or changed")
+        with open(data_file + ".tmp", "w", encoding="utf-8") as f:
+            f.write(content)
+        changed.append(data_file)
+    for data_file in changed:
+        os.replace(data_file + ".tmp", data_file)
+    print(f"{len(changed)} of {len(contents)} data files changed")
+
+
+def read_index(base_url, page_cache, refetch=False):
+    '''the urls of every pokemon page listed on the national dex page'''
+    url = base_url + INDEX_PATH
+    if refetch:
+        html, _ = download(url)
+        save_page(url, page_cache, html)
+    else:
+        html = fetch_page(url, page_cache)
+    index = IndexPageParser()
+    index.feed(html)
+    index.close()
+    print(f"{len(index.links)} pokemon pages listed on {url}")
+    return [urllib.parse.urljoin(url, link) for link in index.links]
+
+
+def scrape(base_url, page_cache, workers):
+    '''the pokedex.csv rows and region numbers of every pokemon, fetching workers pages at a
+       time. pages are parsed in national dex order as they arrive'''
+    urls = read_index(base_url, page_cache)
+    rows = []
+    region_nums = new_region_nums()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for url, html in zip(urls, executor.map(lambda url: fetch_page(url, page_cache), urls)):
+            rows.extend(get_pokemon_data(url, html, region_nums))
+    return rows, region_nums
+
+
+def manifest_entry(url, html):
+    '''the manifest entry of a page, its content hash, rows and regions'''
+    region_nums = new_region_nums()
+    return {"sha256": hashlib.sha256(html.encode("utf-8")).hexdigest(),
+            "rows": get_pokemon_data(url, html, region_nums),
+            "regions": {dexname: sorted(dexnums)
+                        for dexname, dexnums in region_nums.items() if dexnums}}
+
+
+def update(base_url, page_cache, workers):
+    '''the pokedex.csv rows and region numbers of every pokemon, only parsing the pages that
+       are new or changed since the last update. the manifest in the page cache keeps each
+       page's validators, content hash, rows and regions. pages with validators are asked for
+       conditionally, so the server only sends them when they changed. returns the rows,
+       region numbers and the number of pages that were new or changed'''
+    manifest_file = os.path.join(page_cache, "manifest.json")
+    manifest = {}
+    if os.path.isfile(manifest_file):
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    urls = read_index(base_url, page_cache, refetch=True)
+    # pages saved by scrape before the first update are as they were when they were saved,
+    # so they are only fetched again if they changed since
+    for url in urls:
+        page_file = page_path(url, page_cache)
+        if url not in manifest and os.path.isfile(page_file):
+            with open(page_file, "r", encoding="utf-8") as f:
+                manifest[url] = manifest_entry(url, f.read())
+            manifest[url]["last_modified"] = email.utils.formatdate(os.path.getmtime(page_file),
+                                                                     usegmt=True)
+
+    def check(url):
+        headers = {}
+        if "etag" in manifest.get(url, {}):
+            headers["If-None-Match"] = manifest[url]["etag"]
+        if "last_modified" in manifest.get(url, {}):
+            headers["If-Modified-Since"] = manifest[url]["last_modified"]
+        return download(url, headers)
+
+    new_manifest = {}
+    num_changed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for url, (html, headers) in zip(urls, executor.map(check, urls)):
+            entry = manifest.get(url)
+            if html is not None:
+                digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+                if entry is None or entry["sha256"] != digest:
+                    save_page(url, page_cache, html)
+                    entry = manifest_entry(url, html)
+                    num_changed += 1
+                entry = {key: value for key, value in entry.items()
+                         if key not in ("etag", "last_modified")}
+                if headers.get("ETag"):
+                    entry["etag"] = headers["ETag"]
+                if headers.get("Last-Modified"):
+                    entry["last_modified"] = headers["Last-Modified"]
+            new_manifest[url] = entry
+    print(f"{num_changed} of {len(urls)} pokemon pages are new or changed")
+
+    rows = []
+    region_nums = new_region_nums()
+    for entry in new_manifest.values():
+        rows.extend(entry["rows"])
+        for dexname, dexnums in entry["regions"].items():
+            region_nums[dexname].update(dexnums)
+    os.makedirs(page_cache, exist_ok=True)
+    with open(manifest_file + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(new_manifest, f, indent=1)
+    os.replace(manifest_file + ".tmp", manifest_file)
+    return rows, region_nums, num_changed
+
+
+def scrape_legacy(base_url):
+    '''the pokedex.csv rows and region numbers of every pokemon, driving a chrome browser
+       through every "next" button of the pokemon pages'''
+    # pylint: disable=import-outside-toplevel
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    options = Options()
+    options.headless = True
+    options.add_argument("--log-level=3")
+    options.add_argument("--window-size=1920,1080")
+    driver = webdriver.Chrome(options=options, service=Service(ChromeDriverManager().install()))
+
+    def get_panel_data(panel, name):
+        '''get data for one variation/tab in page of the pokemon'''
+        xpath = ".//h2[text()='Pokédex data']/following::table[@class='vitals-table']"
+        pokedex_data = panel.find_element(By.XPATH, xpath)
+        xpath = ".//h2[text()='Base stats']/following::table[@class='vitals-table']"
+        base_stats = panel.find_element(By.XPATH, xpath)
+        rows.append(get_variation_data(name, pokedex_data.text, base_stats.text, region_nums))
+
+    def get_page_data(page):
+        '''get data for one pokemon'''
+        h1 = page.find_element(By.TAG_NAME, "h1")
+        name = h1.text
+        base_name = name
+        pdata_header_xpath = "//h2[text()='Pokédex data']"
+        if len(driver.find_elements(By.XPATH, pdata_header_xpath)) < 1:
+            print(f"No pokemon found on page {page}")
+        elif len(driver.find_elements(By.XPATH, pdata_header_xpath)) == 1:
+            single_tab_xpath = (pdata_header_xpath +
+                                "/ancestor-or-self::" +
+                                "div[@class='tabset-basics sv-tabs-wrapper sv-tabs-onetab']")
+            get_panel_data(page.find_element(By.XPATH, single_tab_xpath), name)
+        else:
+            active_tab_xpath = (pdata_header_xpath +
+                                "/ancestor-or-self::" +
+                                "div[@class='sv-tabs-panel active']")
+            tab_select_xpath = (pdata_header_xpath +
+                                "/ancestor-or-self::" +
+                                "div[@class='tabset-basics sv-tabs-wrapper ']" +
+                                "/div[@class='sv-tabs-tab-list']/a")
+            for atab in page.find_elements(By.XPATH, tab_select_xpath):
+                if base_name not in atab.text:
+                    name = base_name + " - " + atab.text
+                else:
+                    name = atab.text
+                atab.click()
+                get_panel_data(page.find_element(By.XPATH, active_tab_xpath), name)
+
+    next_button_xpath = "//a[@class='entity-nav-next']"
+    rows = []
+    region_nums = new_region_nums()
+    driver.get(base_url + "/pokedex/bulbasaur")
+    while len(driver.find_elements(By.XPATH, next_button_xpath)) > 0:
+        get_page_data(driver)
+        driver.find_element(By.XPATH, next_button_xpath).click()
+    # when new things are happening, pages may be missing the next button to get to the latest.
+    missing_poke_addresses = []
+    for address in missing_poke_addresses:
+        driver.get(address)
+        get_page_data(driver)
+    driver.quit()
+    return rows, region_nums
+
+
+def main():
+    '''scrapes every pokemon and replaces the data files'''
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base_url", default=BASE_URL,
+                        help="site to scrape, such as a local server of saved pages for testing")
+    parser.add_argument("--workers", default=4, type=int,
+                        help="number of pages to fetch at once")
+    parser.add_argument("--page_cache", default=os.path.join(cache_path, "pages"),
+                        help="folder fetched pages are saved in and read from on later runs")
+    parser.add_argument("--data_dir", default=data_path,
+                        help="folder to write pokedex.csv and the region files to")
+    parser.add_argument("--update", action='store_true',
+                        help="only fetch and parse the pages that are new or changed since the " +
+                        "last update, and only replace the data files that changed")
+    parser.add_argument("--legacy", action='store_true',
+                        help="drive a chrome browser through every page with selenium instead")
+    args = parser.parse_args()
+    base_url = args.base_url.rstrip("/")
+
+    if args.update and args.legacy:
+        parser.error("--update can't be used with --legacy")
+    if args.update:
+        rows, region_nums, _ = update(base_url, args.page_cache, args.workers)
+        write_data(args.data_dir, rows, region_nums)
+        return
+    if os.path.isfile(os.path.join(args.data_dir, "pokedex.csv")):
+        iny = input("pokedex.csv already exists, do you really want to run again and replace " +
+                    "data? Be kind to pokemondb's bandwidth. Enter y to continue, anything " +
+                    "else to exit:")
+        if iny != 'y':
+            sys.exit()
+    if args.legacy:
+        rows, region_nums = scrape_legacy(base_url)
     else:
-        active_tab_xpath = (pdata_header_xpath +
-                            "/ancestor-or-self::" +
-                            "div[@class='sv-tabs-panel active']")
-        tab_select_xpath = (pdata_header_xpath +
-                            "/ancestor-or-self::" +
-                            "div[@class='tabset-basics sv-tabs-wrapper ']" +
-                            "/div[@class='sv-tabs-tab-list']/a")
-        for atab in page.find_elements(By.XPATH, tab_select_xpath):
-            if base_name not in atab.text:
-                name = base_name + " - " + atab.text
-            else:
-                name = atab.text
-            atab.click()
-            apanel = page.find_element(By.XPATH, active_tab_xpath)
-            get_variation_data(apanel, name, region_nums, region_dexnames)
-
-
-NEXT_BUTTON_XPATH = "//a[@class='entity-nav-next']"
-REGION_NUMS = {"gen1_kanto": set(),
-               "gen2_johto": set(),
-               "gen3_hoenn": set(),
-               "gen3_kanto": set(),
-               "gen4_sinnoh": set(),
-               "gen4_sinnoh2": set(),
-               "gen4_johto": set(),
-               "gen5_unova": set(),
-               "gen5_unova2": set(),
-               "gen6_kalos": set(),
-               "gen6_hoenn": set(),
-               "gen7_alola": set(),
-               "gen7_alola2": set(),
-               "gen7_kanto": set(),
-               "gen8_galar": set(),
-               "gen8_galar2": set(),
-               "gen8_galar3": set(),
-               "gen8_sinnoh": set(),
-               "gen8_hisui": set(),
-               "gen9_paldea": set(),
-               "gen9_paldea2": set(),
-               "gen9_paldea3": set(),
-               }
-REGION_DEXNAMES = {"Red/Blue/Yellow": "gen1_kanto",
-                   "Yellow/Red/Blue": "gen1_kanto",
-                   "Gold/Silver/Crystal": "gen2_johto",
-                   "Crystal/Gold/Silver": "gen2_johto",
-                   "Ruby/Sapphire/Emerald": "gen3_hoenn",
-                   "FireRed/LeafGreen": "gen3_kanto",
-                   "Diamond/Pearl": "gen4_sinnoh",
-                   "Platinum": "gen4_sinnoh2",
-                   "HeartGold/SoulSilver": "gen4_johto",
-                   "Black/White": "gen5_unova",
-                   "Black 2/White 2": "gen5_unova2",
-                   "X/Y — Central Kalos": "gen6_kalos",
-                   "X/Y — Coastal Kalos": "gen6_kalos",
-                   "X/Y — Mountain Kalos": "gen6_kalos",
-                   "Omega Ruby/Alpha Sapphire": "gen6_hoenn",
-                   "Sun/Moon — Alola dex": "gen7_alola",
-                   "U.Sun/U.Moon — Alola dex": "gen7_alola2",
-                   "Let's Go Pikachu/Let's Go Eevee": "gen7_kanto",
-                   "Sword/Shield": "gen8_galar",
-                   "The Isle of Armor": "gen8_galar2",
-                   "The Crown Tundra": "gen8_galar3",
-                   "Brilliant Diamond/Shining Pearl": "gen8_sinnoh",
-                   "Legends: Arceus": "gen8_hisui",
-                   "Scarlet/Violet": "gen9_paldea",
-                   "The Teal Mask": "gen9_paldea2",
-                   "The Indigo Disk": "gen9_paldea3",
-                   }
-data_path = os.path.join(os.path.dirname(__file__), "data")
-if not os.path.isdir(data_path):
-    os.mkdir(data_path)
-if os.path.isfile(os.path.join(data_path, "pokedex.csv")):
-    iny = input("pokedex.csv already exists, do you really want to run again and replace data? " +
-                "Be kind to pokemondb's bandwidth. Enter y to continue, anything else to exit:")
-    if iny != 'y':
-        exit()
-
-POKEDEX_FILE = open(os.path.join(data_path, "pokedex.csv"), "w", encoding="utf-8")
-driver.get("https://pokemondb.net/pokedex/bulbasaur")
-while len(driver.find_elements(By.XPATH, NEXT_BUTTON_XPATH)) > 0:
-    get_pokemon_data(driver, REGION_NUMS, REGION_DEXNAMES)
-    driver.find_element(By.XPATH, NEXT_BUTTON_XPATH).click()
-# when new things are happening, pages may be missing the next button to get to the latest.
-missing_poke_addresses = []
-for address in missing_poke_addresses:
-    driver.get(address)
-    get_pokemon_data(driver, REGION_NUMS, REGION_DEXNAMES)
-POKEDEX_FILE.close()
-for dexname, dexnums in REGION_NUMS.items():
-    nums_file = open(os.path.join(data_path, dexname + "_national_dex_numbers.txt"),
-                     "w", encoding="utf-8")
-    for poke_number in dexnums:
-        nums_file.write(str(poke_number)+"\n")
-    nums_file.close()
-    print(f"{len(dexnums)} pokemon in pokedex for {dexname}")
-
-driver.quit()
+        rows, region_nums = scrape(base_url, args.page_cache, args.workers)
+    write_data(args.data_dir, rows, region_nums)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,642 @@
+"""searches combinations of candidate pokemon for the best scoring teams,
+   works only on indexes and bitmasks of dual types so it can be split across processes"""
+import hashlib
+import heapq
+import multiprocessing
+import os
+import pickle
+import random
+import signal
+import sys
+import timeit
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from math import comb
+
+
+@dataclass(order=True, frozen=True)
+class Score:
+    """Class representing a Score assigned to a team of pokemon"""
+    # number of matchups with at least 1 pokemon
+    # that super effective stab without the opponent doing the same
+    ssestabs_c: int
+    # number of matchups with at least a neutral matchup in addition to
+    # the ssestab one, avoids wipes.
+    fallback_favorable_neutrals_c: int
+    # number of matchups with 2 pokemon with favorable matchups
+    favorables2x_c: int
+    # number of matchups with 2 pokemon with ssestab matchups
+    ssestabs2x_c: int
+    # number of matchupes with 2 or more neutral or better matchups
+    # in addition to the ssestab one
+    fallback_favorable_neutrals2x_c: int
+    # sum of type scores across team
+    tscore: int
+    # uniqueness: sum of pokedex number
+    unique_breaker: int
+
+
+@dataclass
+class Members:
+    """Class holding what the search needs to know about every pokemon that can be on a team,
+       by index. The first num_candidates are picked from, the rest are the start team"""
+    ssestabs: list  # bitmasks of dual types
+    favorables: list  # bitmasks of dual types with ssestabs or restabs
+    goods: list  # bitmasks of dual types with ssestabs, restabs or neutrals
+    tscores: list
+    numbers: list
+    num_candidates: int
+
+
+@dataclass
+class SearchStats:
+    """Class counting what the search did, by depth (the number of picks already made),
+       for finding out which rules prune the search"""
+    nodes: Counter = field(default_factory=Counter)  # candidates tried as the next pick
+    no_new_ssestabs: Counter = field(default_factory=Counter)  # picks adding no ssestabs
+    bound_pruned: Counter = field(default_factory=Counter)  # can't reach MAX_SSESTABS
+    cutoff_rejected: Counter = field(default_factory=Counter)  # full teams below MAX_SSESTABS - 1
+    teams_scored: int = 0
+    score_seconds: float = 0
+    improvements: list = field(default_factory=list)  # (timer, Score) when TOP_SCORE improved
+    start: float = 0  # timer when the search started
+    seconds: float = 0  # time the search took
+
+    def merge(self, other):
+        """adds the counts of another SearchStats, such as one from a worker"""
+        self.nodes.update(other.nodes)
+        self.no_new_ssestabs.update(other.no_new_ssestabs)
+        self.bound_pruned.update(other.bound_pruned)
+        self.cutoff_rejected.update(other.cutoff_rejected)
+        self.teams_scored += other.teams_scored
+        self.score_seconds += other.score_seconds
+        self.improvements.extend(other.improvements)
+
+    def report(self):
+        """the counts as a dictionary that can be written as json,
+           with improvement times in seconds from the start of the search"""
+        improvements = []
+        best = None
+        for timer, team_score in sorted(self.improvements):
+            if best is None or best < team_score:
+                best = team_score
+                improvements.append({"seconds": round(timer - self.start, 3),
+                                     "score": asdict(team_score)})
+        return {"depths": [{"depth": depth,
+                            "nodes": self.nodes[depth],
+                            "no_new_ssestabs": self.no_new_ssestabs[depth],
+                            "bound_pruned": self.bound_pruned[depth],
+                            "cutoff_rejected": self.cutoff_rejected[depth]}
+                           for depth in sorted(self.nodes)],
+                "teams_scored": self.teams_scored,
+                "score_seconds": round(self.score_seconds, 3),
+                "improvements": improvements,
+                "seconds": round(self.seconds, 3)}
+
+
+class TopTeams:
+    """Class keeping the best capacity teams by Score, or every team if capacity is 0.
+       Teams are tuples of member indexes, a team with the same Score as a kept team replaces it"""
+
+    def __init__(self, capacity=0):
+        self.capacity = capacity
+        self.teams = {}  # Score to team
+        self.heap = []  # min heap of the kept Scores, the worst kept team is first
+
+    def __len__(self):
+        return len(self.teams)
+
+    def add(self, team_score, team):
+        """keeps a team if it is one of the best capacity teams so far"""
+        if team_score in self.teams:
+            self.teams[team_score] = team
+            return
+        if self.capacity and len(self.heap) >= self.capacity:
+            if not self.heap[0] < team_score:
+                return
+            del self.teams[heapq.heapreplace(self.heap, team_score)]
+        else:
+            heapq.heappush(self.heap, team_score)
+        self.teams[team_score] = team
+
+    def update(self, teams):
+        """adds every team of a dictionary of Score to team"""
+        for team_score, team in teams.items():
+            self.add(team_score, team)
+
+    def sorted_items(self):
+        """(Score, team) pairs from worst to best"""
+        return sorted(self.teams.items())
+
+
+# state of the search in this process, workers each have their own
+MEMBERS = None
+START_PICKS = ()  # indexes of the start team, added to every team
+TEAM_SIZE = 6  # number of picks the search makes
+KEEP_TOP = 0  # capacity of GOOD_TEAMS
+PROG = 0
+GOOD_TEAMS = TopTeams()
+MAX_SSESTABS = -1
+TOP_SCORE = Score(0, 0, 0, 0, 0, 0, 0)
+# MAX_SSESTABS is shared with the other workers every SYNC_TEAMS teams kept
+SYNC_TEAMS = 4096
+TEAMS_SINCE_SYNC = 0
+# best MAX_SSESTABS across all workers, so they can prune each other's branches
+SHARED_MAX_SSESTABS = None
+# counts of what the search did, None when not profiling so the search only checks for None
+STATS = None
+# seconds between writes of the search progress to a checkpoint file
+CHECKPOINT_INTERVAL = 60
+
+
+# saturating counters of a team with no members, see add_member()
+NO_MEMBERS = (0, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+def add_member(counters, member, members):
+    """adds a member, an index into members, to the saturating counters of a team.
+       Instead of counting every matchup one at a time, each member's ssestabs,
+       favorable (ssestabs or restabs) and good (favorable or neutral) matchups are
+       added as bitmasks into saturating counters, so one | or & counts all matchups at once.
+       counters are (ssestabs1, ssestabs2, favorables1, favorables2, goods1, goods2, goods3,
+       tscore, unique_breaker), where the number is how many members at least have the matchup"""
+    (ssestabs1, ssestabs2, favorables1, favorables2, goods1, goods2, goods3,
+     tscore, unique_breaker) = counters
+    ssestabs = members.ssestabs[member]
+    favorables = members.favorables[member]
+    goods = members.goods[member]
+    return (ssestabs1 | ssestabs, ssestabs2 | ssestabs1 & ssestabs,
+            favorables1 | favorables, favorables2 | favorables1 & favorables,
+            goods1 | goods, goods2 | goods1 & goods, goods3 | goods2 & goods,
+            tscore + members.tscores[member], unique_breaker + members.numbers[member])
+
+
+def counters_score(counters):
+    """the Score of a team from its saturating counters"""
+    (ssestabs1, ssestabs2, _, favorables2, _, goods2, goods3,
+     tscore, unique_breaker) = counters
+    return Score(ssestabs1.bit_count(),
+                 (ssestabs1 & goods2).bit_count(),
+                 (ssestabs1 & favorables2).bit_count(),
+                 ssestabs2.bit_count(),
+                 (ssestabs1 & goods3).bit_count(),
+                 tscore, unique_breaker)
+
+
+def team_counters(team, members):
+    """the saturating counters of a team, a tuple of indexes into members"""
+    counters = NO_MEMBERS
+    for member in team:
+        counters = add_member(counters, member, members)
+    return counters
+
+
+def score_teams(teams, members):
+    """scores a batch of teams, each a tuple of indexes into members"""
+    return [counters_score(team_counters(team, members)) for team in teams]
+
+
+def init_search(members, shared_max_ssestabs=None, max_ssestabs=-1):
+    """sets up the search state of this process"""
+    # pylint: disable=global-statement
+    global MEMBERS
+    global START_PICKS
+    global PROG
+    global GOOD_TEAMS
+    global MAX_SSESTABS
+    global TOP_SCORE
+    global SHARED_MAX_SSESTABS
+    MEMBERS = members
+    START_PICKS = tuple(range(members.num_candidates, len(members.numbers)))
+    PROG = 0
+    GOOD_TEAMS = TopTeams(KEEP_TOP)
+    MAX_SSESTABS = max_ssestabs
+    TOP_SCORE = Score(0, 0, 0, 0, 0, 0, 0)
+    SHARED_MAX_SSESTABS = shared_max_ssestabs
+
+
+def sync_max_ssestabs():
+    """shares this process's MAX_SSESTABS with the other workers, and takes theirs"""
+    # pylint: disable=global-statement
+    global MAX_SSESTABS
+    global TEAMS_SINCE_SYNC
+    TEAMS_SINCE_SYNC = 0
+    if SHARED_MAX_SSESTABS is None:
+        return
+    with SHARED_MAX_SSESTABS.get_lock():
+        if SHARED_MAX_SSESTABS.value < MAX_SSESTABS:
+            SHARED_MAX_SSESTABS.value = MAX_SSESTABS
+        else:
+            MAX_SSESTABS = SHARED_MAX_SSESTABS.value
+
+
+def keep_team(in_counters, picks):
+    """scores a full team near to the high score from the counters of all but its last pick,
+       and keeps it"""
+    # pylint: disable=global-statement
+    global TOP_SCORE
+    global TEAMS_SINCE_SYNC
+    stats = STATS
+    if stats is not None:
+        began = timeit.default_timer()
+    team_score = counters_score(add_member(in_counters, picks[-1], MEMBERS))
+    if stats is not None:
+        stats.score_seconds += timeit.default_timer() - began
+        stats.teams_scored += 1
+    if TOP_SCORE < team_score:
+        TOP_SCORE = team_score
+        if stats is not None:
+            stats.improvements.append((timeit.default_timer(), team_score))
+    # save teams near to the high score
+    GOOD_TEAMS.add(team_score, START_PICKS + picks)
+    TEAMS_SINCE_SYNC += 1
+    if TEAMS_SINCE_SYNC >= SYNC_TEAMS:
+        sync_max_ssestabs()
+
+
+def score(first, in_counters, in_picks, team_size):
+    """makes and scores all possible teams of 6 by adding 1 pokemon at a time,
+       only continuing on to make full team if adding that pokemon improved the team,
+       and if the best ssestabs it could still reach are not below MAX_SSESTABS.
+       only fully scoring if the team is near the best team.
+       picks are indexes into the candidates, in_counters are the saturating counters
+       of the team so far, kept up to date as picks are added so a full team is scored
+       from the counters of the team before its last pick"""
+    # pylint: disable=global-statement
+    # use global variables to track progress and the max ssestabs
+    global PROG
+    global MAX_SSESTABS
+    candidate_ssestabs = MEMBERS.ssestabs
+    num_candidates = MEMBERS.num_candidates
+    stats = STATS
+    in_ssestabs = in_counters[0]
+    depth = len(in_picks)
+    picks_left = team_size - depth - 1
+    if picks_left > 0:
+        reachable = reachable_ssestabs(first, in_ssestabs, picks_left)
+    for index in range(first, num_candidates - picks_left):
+        if stats is not None:
+            stats.nodes[depth] += 1
+        out_ssestabs = in_ssestabs | candidate_ssestabs[index]
+        if out_ssestabs == in_ssestabs:
+            if stats is not None:
+                stats.no_new_ssestabs[depth] += 1
+            PROG += comb(num_candidates - index - 1, picks_left)
+            continue
+        if picks_left > 0:
+            # branch and bound, this branch can't reach the best team found so far
+            if reachable[index - first] < MAX_SSESTABS:
+                if stats is not None:
+                    stats.bound_pruned[depth] += 1
+                PROG += comb(num_candidates - index - 1, picks_left)
+                continue
+            score(index + 1, add_member(in_counters, index, MEMBERS), in_picks + (index,),
+                  team_size)
+        else:
+            PROG += 1
+            ssestabs_c = out_ssestabs.bit_count()
+            if ssestabs_c < (MAX_SSESTABS - 1):
+                if stats is not None:
+                    stats.cutoff_rejected[depth] += 1
+                continue
+            MAX_SSESTABS = max(MAX_SSESTABS, ssestabs_c)
+            keep_team(in_counters, in_picks + (index,))
+
+
+def reachable_ssestabs(first, in_ssestabs, picks_left):
+    """upper bound of the ssestabs a team can reach by picking each candidate from first on,
+       then picks_left more after it. Each pick can add at most the ssestabs it adds on its own
+       to in_ssestabs, so the bound is in_ssestabs plus the candidate's gain plus the
+       picks_left biggest gains of the candidates after it"""
+    candidate_ssestabs = MEMBERS.ssestabs
+    gains = [(candidate_ssestabs[index] & ~in_ssestabs).bit_count()
+             for index in range(first, MEMBERS.num_candidates)]
+    in_ssestabs_c = in_ssestabs.bit_count()
+    reachable = [0] * len(gains)
+    best_later = []  # min heap of the picks_left biggest gains after the current candidate
+    best_later_sum = 0
+    for position in range(len(gains) - 1, -1, -1):
+        reachable[position] = in_ssestabs_c + gains[position] + best_later_sum
+        if len(best_later) < picks_left:
+            heapq.heappush(best_later, gains[position])
+            best_later_sum += gains[position]
+        elif gains[position] > best_later[0]:
+            best_later_sum += gains[position] - heapq.heapreplace(best_later, gains[position])
+    return reachable
+
+
+def split_search(members, start_counters, team_size, depth, stats=None):
+    """splits the search into subtrees by their first depth picks, the same way score()
+       would pick them, returns a list of (picks, counters) tasks
+       and the number of teams skipped on the way"""
+    tasks = []
+    skipped = 0
+
+    def split(first, in_counters, in_picks):
+        nonlocal skipped
+        in_ssestabs = in_counters[0]
+        picks_left = team_size - len(in_picks) - 1
+        for index in range(first, members.num_candidates - picks_left):
+            if stats is not None:
+                stats.nodes[len(in_picks)] += 1
+            out_ssestabs = in_ssestabs | members.ssestabs[index]
+            if out_ssestabs == in_ssestabs:
+                if stats is not None:
+                    stats.no_new_ssestabs[len(in_picks)] += 1
+                skipped += comb(members.num_candidates - index - 1, picks_left)
+                continue
+            out_picks = in_picks + (index,)
+            out_counters = add_member(in_counters, index, members)
+            if len(out_picks) < depth:
+                split(index + 1, out_counters, out_picks)
+            else:
+                tasks.append((out_picks, out_counters))
+
+    if depth > 0:
+        split(0, start_counters, ())
+    else:
+        tasks.append(((), start_counters))
+    return tasks, skipped
+
+
+def run_task(task):
+    """searches every team starting with a task's picks,
+       returns the good teams found, how many teams were assessed and the task's SearchStats"""
+    # pylint: disable=global-statement
+    global PROG
+    global GOOD_TEAMS
+    global STATS
+    picks, counters = task
+    sync_max_ssestabs()
+    PROG = 0
+    if STATS is not None:
+        STATS = SearchStats()
+    first = picks[-1] + 1 if picks else 0
+    score(first, counters, picks, TEAM_SIZE)
+    sync_max_ssestabs()
+    good_teams = GOOD_TEAMS.teams
+    GOOD_TEAMS = TopTeams(KEEP_TOP)
+    return good_teams, PROG, STATS
+
+
+def init_worker(members, team_size, keep_top, shared_max_ssestabs, max_ssestabs=-1,
+                profile=False):
+    """initializes a worker process of the search pool"""
+    # pylint: disable=global-statement
+    global TEAM_SIZE
+    global KEEP_TOP
+    global STATS
+    TEAM_SIZE = team_size
+    KEEP_TOP = keep_top
+    STATS = SearchStats() if profile else None
+    init_search(members, shared_max_ssestabs, max_ssestabs)
+
+
+def init_pool_worker(*args):
+    """initializes a worker process of the search pool, leaving Ctrl-C to the main process,
+       which stops the pool"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_worker(*args)
+
+
+def search_digest(members, team_size, keep_top):
+    """hash of everything that decides the results of a search,
+       so a checkpoint can't be resumed by a different search.
+       Dual types can be given different bits each run, so the bitmasks are hashed as
+       the sorted columns of which members have each bit"""
+    masks = [*members.ssestabs, *members.favorables, *members.goods]
+    width = max((mask.bit_length() for mask in masks), default=0)
+    columns = sorted(column for column in
+                     (tuple(mask >> bit & 1 for mask in masks) for bit in range(width))
+                     if any(column))
+    return hashlib.sha256(repr((columns, members.tscores, members.numbers, members.num_candidates,
+                                team_size, keep_top)).encode("utf-8")).hexdigest()
+
+
+def save_checkpoint(path, state):
+    """writes the search state to path, replacing the last checkpoint only once it is written"""
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+
+def load_checkpoint(path, digest):
+    """reads the search state written by save_checkpoint, exits if it is of a different search"""
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    if state["digest"] != digest:
+        sys.exit(f"{path} is a checkpoint of a different search, the pokedex, settings or " +
+                 "parameters have changed since it was written")
+    return state
+
+
+def run_to_end(generator):
+    """runs a generator to its end, returns what it returns"""
+    while True:
+        try:
+            next(generator)
+        except StopIteration as stop:
+            return stop.value
+
+
+def search(members, team_size, workers=1, keep_top=0,
+           checkpoint=None, resume=None, stats=None, time_budget=0, seed_teams=()):
+    """search_incumbents() without the incumbents, returns what it returns"""
+    return run_to_end(search_incumbents(members, team_size, workers, keep_top,
+                                        checkpoint, resume, stats, time_budget, seed_teams))
+
+
+def search_incumbents(members, team_size, workers=1, keep_top=0,
+                      checkpoint=None, resume=None, stats=None, time_budget=0, seed_teams=()):
+    """searches all teams of team_size picks from the candidates, added to the start team,
+       across workers processes splitting the search by the first two picks.
+       yields (Score, team) each time a better team is found, as parts of the search finish.
+       stops early after time_budget seconds (0 for no limit), or on Ctrl-C.
+       every CHECKPOINT_INTERVAL seconds the finished parts of the search are written to
+       checkpoint, resume continues from such a file and keeps checkpointing to it.
+       stats is a SearchStats the counts of every worker are added to, None to not count.
+       seed_teams are teams known before searching, such as the best of an earlier search,
+       starting the search from the best of them instead of from nothing.
+       returns the best keep_top (0 for all) good teams found as TopTeams of
+       tuples of member indexes, the top score, and why the search stopped early or None"""
+    start = timeit.default_timer()
+    num_combinations = comb(members.num_candidates, team_size)
+    print("there are " + str(num_combinations) + " teams to assess")
+    start_counters = team_counters(range(members.num_candidates, len(members.numbers)), members)
+    tasks, prog = split_search(members, start_counters, team_size, min(2, team_size - 1),
+                               stats)
+    good_teams = TopTeams(keep_top)
+    top_score = Score(0, 0, 0, 0, 0, 0, 0)
+    # tasks are merged in order, so the state of the search is how many have been merged
+    done = 0
+    max_ssestabs = -1
+    # only checkpoints are checked against it, hashing every bitmask is not free
+    digest = search_digest(members, team_size, keep_top) if checkpoint or resume else None
+    if resume:
+        state = load_checkpoint(resume, digest)
+        done, prog = state["done"], state["prog"]
+        good_teams, top_score = state["good_teams"], state["top_score"]
+        # every team near the high score is scored between tasks, so this is MAX_SSESTABS
+        max_ssestabs = state["max_ssestabs"]
+        start -= state["elapsed"]
+        print(f"resuming from {resume}, {done} of {len(tasks)} parts of the search are done")
+        checkpoint = checkpoint or resume
+    elif seed_teams:
+        # the search never prunes a team that beats the best of them, so the best teams it
+        # finds are the same, it just skips more of the teams that are worse
+        good_teams.update(dict(zip(score_teams(seed_teams, members), seed_teams)))
+        top_score = max(good_teams.teams)
+        max_ssestabs = top_score.ssestabs_c
+        print(f"starting from {len(seed_teams)} known teams, current max ssestabs: {max_ssestabs}")
+    last_checkpoint = run_start = timeit.default_timer()
+    if stats is not None:
+        stats.start = timeit.default_timer()
+
+    def write_checkpoint():
+        save_checkpoint(checkpoint, {"digest": digest, "done": done, "prog": prog,
+                                     "good_teams": good_teams, "top_score": top_score,
+                                     "max_ssestabs": max_ssestabs,
+                                     "elapsed": timeit.default_timer() - start})
+
+    def merge(results):
+        """merges the results of tasks as they finish, yielding improvements of the top score.
+           returns why the search stopped early, or None if every task finished"""
+        nonlocal done, prog, top_score, max_ssestabs, last_checkpoint
+        while True:
+            try:
+                task_teams, task_prog, task_stats = next(results)
+            except StopIteration:
+                return None
+            except KeyboardInterrupt:
+                # the task that was running is lost, the merged ones are kept
+                return "interrupted"
+            if stats is not None:
+                stats.merge(task_stats)
+            done += 1
+            prog += task_prog
+            # merging in task order gives the same teams as one process would
+            good_teams.update(task_teams)
+            last_top_score = top_score
+            top_score = max([top_score, *task_teams])
+            if len(good_teams) > 0:
+                max_ssestabs = top_score.ssestabs_c
+            if checkpoint and timeit.default_timer() - last_checkpoint > CHECKPOINT_INTERVAL:
+                write_checkpoint()
+                last_checkpoint = timeit.default_timer()
+            elapsed_time = timeit.default_timer() - start
+            estimated_time_left = (elapsed_time/(max(prog, 1)/num_combinations)) - elapsed_time
+            print(f"{round(100*prog/num_combinations, 2):.2f}% of the way" +
+                  f"done, current max ssestabs: {top_score.ssestabs_c}, time elapsed: " +
+                  f"{round(elapsed_time)}, est. time remaining: " +
+                  f"{round(estimated_time_left)}         \r", end='')
+            if last_top_score < top_score:
+                yield top_score, good_teams.teams[top_score]
+            if (time_budget and timeit.default_timer() - run_start > time_budget and
+                    done < len(tasks)):
+                return f"out of time after {time_budget} seconds"
+
+    if workers > 1:
+        # fork where possible, so workers don't re-run the calling script
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+        shared_max_ssestabs = context.Value("i", max_ssestabs)
+        with context.Pool(workers, initializer=init_pool_worker,
+                          initargs=(members, team_size, keep_top, shared_max_ssestabs,
+                                    max_ssestabs, stats is not None)) as pool:
+            stopped = yield from merge(pool.imap(run_task, tasks[done:]))
+    else:
+        init_worker(members, team_size, keep_top, None, max_ssestabs, stats is not None)
+        stopped = yield from merge(map(run_task, tasks[done:]))
+    if checkpoint:
+        write_checkpoint()
+    if stats is not None:
+        stats.seconds = timeit.default_timer() - stats.start
+    print()
+    if stopped:
+        print(f"search stopped early, {stopped}, {round(100*prog/num_combinations, 2):.2f}% " +
+              "of teams were assessed. These are the best teams found so far")
+    return good_teams, top_score, stopped
+
+
+def local_search(members, team_size, time_budget=0, seed=None, keep_top=0, patience=200):
+    """anytime search for good teams when there are too many candidates to try every team.
+       starts from a greedy max coverage team, then hill climbs by making the best scoring swap
+       of one pick for a candidate not on the team. When no swap improves the team, the best team
+       found is perturbed by random swaps and climbed again, until time_budget seconds have passed
+       (0 for no limit) or patience perturbations in a row found nothing better.
+       returns the good teams found like search()"""
+    start = timeit.default_timer()
+    if seed is None:
+        seed = random.randrange(2**32)
+    print(f"local search with seed {seed}, rerun with --seed {seed} to repeat it")
+    rng = random.Random(seed)
+    start_picks = tuple(range(members.num_candidates, len(members.numbers)))
+    good_teams = TopTeams(keep_top)
+    if members.num_candidates < team_size:
+        return good_teams, Score(0, 0, 0, 0, 0, 0, 0)
+
+    def out_of_time():
+        return time_budget and timeit.default_timer() - start > time_budget
+
+    def best_of(teams):
+        """highest scoring of teams of picks, with its score"""
+        best_team = None
+        best_score = Score(0, 0, 0, 0, 0, 0, 0)
+        for team, team_score in zip(teams, score_teams([start_picks + team for team in teams],
+                                                       members)):
+            if best_team is None or best_score < team_score:
+                best_team = team
+                best_score = team_score
+        return best_team, best_score
+
+    def climb(picks):
+        """swaps picks until no single swap improves the team"""
+        picks, current = best_of([picks])
+        while not out_of_time():
+            swaps = []
+            for position in range(len(picks)):
+                rest = picks[:position] + picks[position + 1:]
+                swaps.extend(rest + (candidate,) for candidate in range(members.num_candidates)
+                             if candidate not in picks)
+            swap, swap_score = best_of(swaps)
+            if current >= swap_score:
+                break
+            picks, current = tuple(sorted(swap)), swap_score
+        good_teams.add(current, start_picks + picks)
+        return picks, current
+
+    # greedy max coverage team, adding whichever candidate scores best each time
+    picks = ()
+    while len(picks) < team_size:
+        picks, _ = best_of([picks + (candidate,) for candidate in range(members.num_candidates)
+                            if candidate not in picks])
+    best_picks, top_score = climb(tuple(sorted(picks)))
+    if members.num_candidates == team_size:
+        # every candidate is on the team, there is nothing to swap in
+        return good_teams, top_score
+
+    stale = 0
+    try:
+        while stale < patience and not out_of_time():
+            picks = list(best_picks)
+            for _ in range(min(2, team_size)):
+                picks[rng.randrange(team_size)] = rng.choice(
+                    [candidate for candidate in range(members.num_candidates)
+                     if candidate not in picks])
+            picks, current = climb(tuple(sorted(picks)))
+            if top_score < current:
+                best_picks, top_score = picks, current
+                stale = 0
+            else:
+                stale += 1
+            elapsed_time = timeit.default_timer() - start
+            print(f"current max ssestabs: {top_score.ssestabs_c}, time elapsed: " +
+                  f"{round(elapsed_time)}, perturbations without improving: {stale}         \r",
+                  end='')
+    except KeyboardInterrupt:
+        print("\nsearch stopped early, interrupted. These are the best teams found so far",
+              end='')
+    print()
+    return good_teams, top_score
@@ -0,0 +1,135 @@
+"""Serves the best teams for regions over local HTTP, keeping the pokedex and type matchups
+   loaded between requests and answering repeated requests from memory"""
+import argparse
+import contextlib
+import io
+import json
+import traceback
+from collections import OrderedDict
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from engine import Engine, Query, region_choices
+from pokedex import typekey_effects
+
+# request fields to the Query setting they set
+REQUEST_FIELDS = {"regions": "input_dex", "include": "include_names",
+                  "exclude": "exclude_names", "exclude_nums": "exclude_nums",
+                  "stat_exclude": "stat_exclude", "rank_types_exclude": "rank_types_exclude",
+                  "mode": "mode", "time_budget": "time_budget", "seed": "seed",
+                  "keep_top": "keep_top"}
+
+
+def poke_json(poke):
+    """a pokemon as a dictionary that can be written as json"""
+    return {"name": poke.name, "number": poke.number, "type1": poke.type1, "type2": poke.type2,
+            "base_stats": poke.tbstat,
+            "ability_effects": [atype + "_" + effect
+                                for atype, effect in typekey_effects(poke.typekey)]}
+
+
+class TeamService:
+    """Class answering team requests with an Engine, keeping the last cache_size answers"""
+
+    def __init__(self, engine, cache_size=128):
+        self.engine = engine
+        self.cache_size = cache_size
+        self.results = OrderedDict()  # request as json to its answer, least recently used first
+
+    def teams(self, request):
+        """the best teams for a request, a dictionary of REQUEST_FIELDS.
+           raises ValueError for requests that can't be answered"""
+        unknown = set(request) - set(REQUEST_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown fields {sorted(unknown)}, use {sorted(REQUEST_FIELDS)}")
+        key = json.dumps(request, sort_keys=True)
+        if key in self.results:
+            self.results.move_to_end(key)
+            return self.results[key]
+        query = Query(**{REQUEST_FIELDS[name]: value for name, value in request.items()})
+        if query.mode not in ("exhaustive", "local"):
+            raise ValueError(f"mode {query.mode} is invalid, use exhaustive or local")
+        # the engine reports its progress as it goes, which is not wanted here
+        with contextlib.redirect_stdout(io.StringIO()):
+            teams = self.engine.find_teams(query)
+        result = {"top_score": asdict(teams.top_score),
+                  "teams": [{"score": asdict(team_score),
+                             "pokemon": [poke_json(poke)
+                                         for poke in sorted(team, key=lambda x: x.name)]}
+                            for team_score, team in reversed(teams.best_teams())]}
+        # a search stopped early by the time budget or Ctrl-C may not have the best teams
+        if teams.stopped is None:
+            self.results[key] = result
+            if len(self.results) > self.cache_size:
+                self.results.popitem(last=False)
+        return result
+
+
+class TeamRequestHandler(BaseHTTPRequestHandler):
+    """answers GET /regions with the regions that can be asked for,
+       and POST /teams with the best teams for the json request in the body"""
+    service = None  # the TeamService answering requests
+
+    def send_json(self, status, body):
+        """sends a json response"""
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """lists the regions"""
+        if self.path == "/regions":
+            self.send_json(200, {"regions": region_choices})
+        else:
+            self.send_json(404, {"error": f"no such path {self.path}, use /regions or /teams"})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """finds teams"""
+        if self.path != "/teams":
+            self.send_json(404, {"error": f"no such path {self.path}, use /teams"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not isinstance(request, dict):
+                raise ValueError("request must be a json object")
+            self.send_json(200, self.service.teams(request))
+        except (ValueError, TypeError) as error:
+            self.send_json(400, {"error": str(error)})
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # anything else is a bug, logged here so the server keeps answering requests
+            self.log_error("error answering %s: %r", self.path, error)
+            traceback.print_exc()
+            self.send_json(500, {"error": f"internal error: {error!r}"})
+
+
+def main():
+    """loads the regions and serves requests until stopped"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", default=8000, type=int, help="port to listen on")
+    parser.add_argument("--cache_size", default=128, type=int,
+                        help="number of answers to keep for repeated requests")
+    parser.add_argument("--preload", default=[region for region in region_choices
+                                              if region != "hypothetical"], nargs="*",
+                        help="regions to load before serving, others load on their first request")
+    args = parser.parse_args()
+
+    engine = Engine()
+    for region in args.preload:
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.load_dex(Query(input_dex=[region]))
+    TeamRequestHandler.service = TeamService(engine, args.cache_size)
+    # one request at a time, the search keeps its state in the search module
+    server = HTTPServer((args.host, args.port), TeamRequestHandler)
+    print(f"serving teams on http://{args.host}:{args.port}/teams")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""tests of the engine's pokedex shortlist"""
+import io
+import contextlib
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pylint: disable=wrong-import-position
+from engine import Engine, Query
+
+
+class ShortlistTest(unittest.TestCase):
+    """tests of Engine.shortlist"""
+
+    def shortlist(self, **settings):
+        """the names and numbers of the shortlisted gen1_kanto pokemon"""
+        query = Query(input_dex=["gen1_kanto"], stat_exclude=0, **settings)
+        with contextlib.redirect_stdout(io.StringIO()):
+            dex, _, _ = Engine(use_cache=False).shortlist(query)
+        return {poke.name for poke in dex}, {poke.number for poke in dex}
+
+    def test_exclude_names_and_nums(self):
+        """excluded pokemon are removed by name part and by national dex number"""
+        names, numbers = self.shortlist(exclude_names=[], exclude_nums=[])
+        self.assertIn(94, numbers)
+        self.assertIn(150, numbers)
+        names, numbers = self.shortlist(exclude_names=["gengar"], exclude_nums=[150])
+        self.assertFalse([name for name in names if "Gengar" in name])
+        self.assertNotIn(94, numbers)
+        self.assertNotIn(150, numbers)
+
+    def test_exclude_name_matching_twice(self):
+        """a pokemon matching several exclude names is removed once"""
+        names, _ = self.shortlist(exclude_names=["Gengar", "Geng"], exclude_nums=[])
+        self.assertFalse([name for name in names if "Gengar" in name])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""tests of the pokedex filters"""
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pylint: disable=wrong-import-position
+from pokedex import Pokemon, remove_dominated
+
+
+def make_dex(matchups):
+    """a dex and dual_types of pokemon named after their types,
+       from a dictionary of (type1, type2) to (score, ssestabs_mask, restabs_mask)"""
+    dex = set()
+    dual_types = {}
+    for (type1, type2), (score, ssestabs_mask, restabs_mask) in matchups.items():
+        poke = Pokemon(f"{type1} {type2}", len(dex) + 1, type1, type2, 500, "", "", "")
+        dex.add(poke)
+        dual_types[poke.typekey] = SimpleNamespace(score=score, ssestabs_mask=ssestabs_mask,
+                                                   restabs_mask=restabs_mask)
+    return dex, dual_types
+
+
+def names(dex):
+    """the names in a dex"""
+    return {poke.name for poke in dex}
+
+
+class RemoveDominatedTest(unittest.TestCase):
+    """tests of remove_dominated"""
+
+    def test_identical_keeps_best_score(self):
+        """of pokemon with the same matchups, the one with the best type score is kept"""
+        dex, dual_types = make_dex({("FIRE", "NONE"): (5, 0b011, 0b100),
+                                    ("WATER", "NONE"): (9, 0b011, 0b100)})
+        self.assertEqual(remove_dominated(dex, dual_types), 1)
+        self.assertEqual(names(dex), {"WATER NONE"})
+
+    def test_identical_same_score_keeps_first_name(self):
+        """of pokemon with the same matchups and type score, the first by name is kept"""
+        dex, dual_types = make_dex({("WATER", "NONE"): (5, 0b011, 0b100),
+                                    ("FIRE", "NONE"): (5, 0b011, 0b100),
+                                    ("GRASS", "NONE"): (5, 0b011, 0b100)})
+        self.assertEqual(remove_dominated(dex, dual_types), 2)
+        self.assertEqual(names(dex), {"FIRE NONE"})
+
+    def test_subset_is_dominated(self):
+        """a pokemon whose ssestabs and favorable matchups are a subset of another's is removed,
+           even with a better type score"""
+        dex, dual_types = make_dex({("FIRE", "NONE"): (9, 0b0001, 0b0100),
+                                    ("WATER", "NONE"): (1, 0b0011, 0b0100),
+                                    ("GRASS", "NONE"): (1, 0b0001, 0b1000)})
+        self.assertEqual(remove_dominated(dex, dual_types), 1)
+        self.assertEqual(names(dex), {"WATER NONE", "GRASS NONE"})
+
+    def test_favorable_matchups_count(self):
+        """a restab the other pokemon doesn't have keeps a pokemon with fewer ssestabs"""
+        dex, dual_types = make_dex({("FIRE", "NONE"): (1, 0b001, 0b100),
+                                    ("WATER", "NONE"): (1, 0b011, 0b000)})
+        self.assertEqual(remove_dominated(dex, dual_types), 0)
+        self.assertEqual(names(dex), {"FIRE NONE", "WATER NONE"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""tests of the scraper, against saved pages served from a local http server"""
+import contextlib
+import functools
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pylint: disable=wrong-import-position
+import scrape
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+EXPECTED_ROWS = ["Bulbasaur,1,GRASS,POISON,318,Overgrow,,Chlorophyll",
+                 "Venusaur,3,GRASS,POISON,530,Overgrow,,Chlorophyll",
+                 "Mega Venusaur,3,GRASS,POISON,625,Thick Fat,,",
+                 "Venusaur - Gigantamax,3,GRASS,NONE,625,Overgrow,Thick Fat,"]
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """serves the fixture pages without logging each request"""
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class ScrapeTest(unittest.TestCase):
+    """scrapes the fixture pages into a temporary page cache and data folder"""
+
+    def setUp(self):
+        handler = functools.partial(QuietHandler, directory=PAGES_DIR)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.page_cache = os.path.join(self.tmp.name, "pages")
+        self.data_dir = os.path.join(self.tmp.name, "data")
+
+    def tearDown(self):
+        self.stop_server()
+        self.tmp.cleanup()
+
+    def stop_server(self):
+        """stops serving pages, later fetches fail"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def scrape(self):
+        """scrapes the pages and writes the data files, returns the pokedex.csv rows"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows, region_nums = scrape.scrape(self.base_url, self.page_cache, 2)
+            scrape.write_data(self.data_dir, rows, region_nums)
+        with open(os.path.join(self.data_dir, "pokedex.csv"), "r", encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_scrape_writes_data_files(self):
+        """every form of every listed pokemon is written, with its regions"""
+        self.assertEqual(self.scrape(), EXPECTED_ROWS)
+        with open(os.path.join(self.data_dir, "gen1_kanto_national_dex_numbers.txt"),
+                  "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "1\n3\n")
+        with open(os.path.join(self.data_dir, "gen2_johto_national_dex_numbers.txt"),
+                  "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "1\n")
+
+    def test_scrape_resumes_from_page_cache(self):
+        """fetched pages are saved, a second run reads them all back"""
+        self.scrape()
+        for page in ("national", "bulbasaur", "venusaur"):
+            self.assertTrue(os.path.isfile(os.path.join(self.page_cache, "pokedex", page)))
+        # a second run reads every page from the cache, so it needs no server
+        self.stop_server()
+        self.assertEqual(self.scrape(), EXPECTED_ROWS)
+
+    def test_scrape_fetches_pages_missing_from_cache(self):
+        """only the pages missing from the cache are fetched again"""
+        self.scrape()
+        # as if the first run was stopped before fetching this page
+        os.remove(os.path.join(self.page_cache, "pokedex", "venusaur"))
+        self.assertEqual(self.scrape(), EXPECTED_ROWS)
+        self.assertTrue(os.path.isfile(os.path.join(self.page_cache, "pokedex", "venusaur")))
+
+    def update(self):
+        """updates the data files, returns the pokedex.csv rows and the number of pages that
+           were new or changed"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows, region_nums, num_changed = scrape.update(self.base_url, self.page_cache, 2)
+            scrape.write_data(self.data_dir, rows, region_nums)
+        with open(os.path.join(self.data_dir, "pokedex.csv"), "r", encoding="utf-8") as f:
+            return f.read().splitlines(), num_changed
+
+    def test_update_without_cache_parses_every_page(self):
+        """the first update with an empty page cache fetches and parses every page"""
+        self.assertEqual(self.update(), (EXPECTED_ROWS, 2))
+        self.assertEqual(self.update(), (EXPECTED_ROWS, 0))
+
+    def test_first_update_starts_from_scraped_pages(self):
+        """pages saved by scrape are only asked for if they changed, so none is parsed again"""
+        self.scrape()
+        self.assertEqual(self.update(), (EXPECTED_ROWS, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
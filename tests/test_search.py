@@ -0,0 +1,128 @@
+"""tests of the team searches"""
+import io
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import unittest
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pylint: disable=wrong-import-position
+from search import Members, local_search, score_teams, search, search_digest
+
+
+def make_members(num_candidates):
+    """members with one ssestab each, all of them candidates"""
+    return Members(ssestabs=[1 << index for index in range(num_candidates)],
+                   favorables=[1 << index for index in range(num_candidates)],
+                   goods=[1 << index for index in range(num_candidates)],
+                   tscores=list(range(num_candidates)),
+                   numbers=list(range(1, num_candidates + 1)),
+                   num_candidates=num_candidates)
+
+
+def random_members(num_candidates, num_types, seed):
+    """members with random overlapping matchups over num_types dual types"""
+    rng = random.Random(seed)
+    ssestabs = [rng.getrandbits(num_types) & rng.getrandbits(num_types)
+                for _ in range(num_candidates)]
+    favorables = [mask | rng.getrandbits(num_types) for mask in ssestabs]
+    goods = [mask | rng.getrandbits(num_types) for mask in favorables]
+    return Members(ssestabs=ssestabs, favorables=favorables, goods=goods,
+                   tscores=[rng.randrange(-20, 20) for _ in range(num_candidates)],
+                   numbers=list(range(1, num_candidates + 1)),
+                   num_candidates=num_candidates)
+
+
+def unpruned_top_teams(members, team_size):
+    """the top score and every team with it, trying every team whose picks each add ssestabs
+       to the picks before them like the search does, without bounding"""
+    teams = []
+    for team in combinations(range(members.num_candidates), team_size):
+        ssestabs = 0
+        for member in team:
+            if ssestabs | members.ssestabs[member] == ssestabs:
+                break
+            ssestabs |= members.ssestabs[member]
+        else:
+            teams.append(team)
+    scores = score_teams(teams, members)
+    top_score = max(scores)
+    return top_score, {team for team, team_score in zip(teams, scores) if team_score == top_score}
+
+
+class LocalSearchTest(unittest.TestCase):
+    """tests of local_search"""
+
+    def test_as_many_candidates_as_team_size(self):
+        """the only possible team is found, with no candidate left to perturb with"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            good_teams, top_score = local_search(make_members(6), 6, seed=0)
+        self.assertEqual(top_score.ssestabs_c, 6)
+        self.assertEqual(good_teams.teams[top_score], tuple(range(6)))
+
+    def test_more_candidates_than_team_size(self):
+        """the team covering the most ssestabs is found"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, top_score = local_search(make_members(8), 6, seed=0, patience=5)
+        self.assertEqual(top_score.ssestabs_c, 6)
+
+
+class ExhaustiveSearchTest(unittest.TestCase):
+    """tests of the exhaustive search"""
+
+    def test_no_candidates(self):
+        """an empty pool finds no teams, with or without a checkpoint digest"""
+        self.assertEqual(len(search_digest(make_members(0), 6, 0)), 64)
+        with contextlib.redirect_stdout(io.StringIO()):
+            good_teams, _, stopped = search(make_members(0), 6)
+        self.assertEqual(len(good_teams), 0)
+        self.assertIsNone(stopped)
+
+    def test_pruning_keeps_top_teams(self):
+        """branch and bound finds the same top score and a top team of trying every team"""
+        for seed in range(5):
+            members = random_members(14, 24, seed)
+            top_score, top_teams = unpruned_top_teams(members, 4)
+            with contextlib.redirect_stdout(io.StringIO()):
+                good_teams, search_top_score, _ = search(members, 4)
+            self.assertEqual(search_top_score, top_score)
+            self.assertIn(good_teams.teams[search_top_score], top_teams)
+
+
+class CheckpointTest(unittest.TestCase):
+    """tests of resuming a search from its checkpoint"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.checkpoint = os.path.join(self.tmp.name, "search.checkpoint")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_matches_uninterrupted(self):
+        """a search stopped by its time budget and resumed finds the same teams as one that
+           was never stopped"""
+        members = random_members(14, 24, 0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            good_teams, top_score, _ = search(members, 4)
+            _, _, stopped = search(members, 4, checkpoint=self.checkpoint, time_budget=1e-9)
+            self.assertIsNotNone(stopped)
+            resumed_teams, resumed_top_score, stopped = search(members, 4,
+                                                               resume=self.checkpoint)
+        self.assertIsNone(stopped)
+        self.assertEqual(resumed_top_score, top_score)
+        self.assertEqual(resumed_teams.teams, good_teams.teams)
+
+    def test_resume_other_search_is_rejected(self):
+        """a checkpoint can't be resumed by a search of different members"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            search(random_members(14, 24, 0), 4, checkpoint=self.checkpoint, time_budget=1e-9)
+            with self.assertRaises(SystemExit):
+                search(random_members(14, 24, 1), 4, resume=self.checkpoint)
+
+
+if __name__ == "__main__":
+    unittest.main()